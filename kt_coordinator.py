@@ -5,11 +5,17 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import logging
-from typing import Optional, Dict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Optional, Dict, List
 
 from visualization.native_display_v2 import KTVisualizationWindow
 from visualization.data_handler import KTDataHandler
 from tests.performance.kt_test_harness import KTTestHarness
+from utils.logger import configure_logging, configure_worker_logging, log_queue
+
+def _run_scenario_worker(test_harness: KTTestHarness, scenario: str) -> List[Dict]:
+    """Run a single scenario without touching Qt, so it can execute in a worker process"""
+    return test_harness.run_test_scenario(scenario) or []
 
 class KTCoordinator:
     """Coordinates K(t) Framework testing and visualization"""
@@ -28,18 +34,7 @@ class KTCoordinator:
     def _setup_logging(self):
         """Configure logging"""
         log_dir = self.base_path / "logs"
-        log_dir.mkdir(parents=True, exist_ok=True)
-        
-        log_file = log_dir / f"kt_coordinator_{datetime.now():%Y%m%d}.log"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        configure_logging(log_dir / f"kt_coordinator_{datetime.now():%Y%m%d}.log")
         self.logger = logging.getLogger(__name__)
 
     def start_visualization(self):
@@ -58,49 +53,87 @@ class KTCoordinator:
             self.logger.error(f"Error starting visualization: {e}")
             raise
 
+    def _ensure_visualization(self):
+        """Create the visualization window if needed and return the QApplication"""
+        from PySide6.QtWidgets import QApplication
+        app = QApplication.instance() or QApplication(sys.argv)
+        
+        if not self.visualization:
+            self.visualization = KTVisualizationWindow()
+            self.visualization.show()
+        
+        return app
+
+    def _publish_results(self, scenario: str, metrics: List[Dict]):
+        """Feed scenario metrics to the visualization and persist them"""
+        # Update visualization if active
+        if self.visualization:
+            for metric in metrics:
+                self.data_handler.add_metrics(metric)
+                if hasattr(self.visualization, 'update_metrics'):
+                    self.visualization.update_metrics()
+        
+        # Save results
+        self._save_test_results(scenario, metrics)
+
     def run_test_scenario(self, scenario: str, visualize: bool = True):
         """Run a test scenario with optional visualization"""
         try:
             # Start visualization if requested
-            if visualize and not self.visualization:
-                from PySide6.QtWidgets import QApplication
-                app = QApplication.instance() or QApplication(sys.argv)
-                self.visualization = KTVisualizationWindow()
-                self.visualization.show()
+            app = self._ensure_visualization() if visualize else None
             
             # Run test scenario
             self.logger.info(f"Starting test scenario: {scenario}")
-            metrics = self.test_harness.run_test_scenario(scenario)
-            
-            # Update visualization if active
-            if self.visualization:
-                for metric in metrics:
-                    self.data_handler.add_metrics(metric)
-                    if hasattr(self.visualization, 'update_metrics'):
-                        self.visualization.update_metrics()
-            
-            # Save results
-            self._save_test_results(scenario, metrics)
+            metrics = _run_scenario_worker(self.test_harness, scenario)
+            self._publish_results(scenario, metrics)
             
             self.logger.info(f"Completed test scenario: {scenario}")
             
             # Keep visualization running if requested
-            if visualize and self.visualization:
+            if app is not None:
                 return app.exec()
                 
         except Exception as e:
             self.logger.error(f"Error in test scenario {scenario}: {e}")
             raise
 
-    def run_all_tests(self, visualize: bool = True):
-        """Run all test scenarios"""
-        for scenario in self.test_harness.test_scenarios:
-            self.run_test_scenario(scenario, visualize)
+    def run_all_tests(self, visualize: bool = True, max_workers: int = 1):
+        """
+        Run all test scenarios in worker processes
+        
+        Results are published from the main process as each scenario
+        completes. Scenarios measure system-wide load, so the default of a
+        single worker keeps them from overlapping; raise max_workers only
+        when cross-scenario interference is acceptable.
+        """
+        app = self._ensure_visualization() if visualize else None
+        
+        # Workers log through this process's listener rather than their own handlers
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=configure_worker_logging,
+                                 initargs=(log_queue(),)) as executor:
+            futures = {
+                executor.submit(_run_scenario_worker, self.test_harness, scenario): scenario
+                for scenario in self.test_harness.test_scenarios
+            }
+            
+            for future in as_completed(futures):
+                scenario = futures[future]
+                try:
+                    self._publish_results(scenario, future.result())
+                    self.logger.info(f"Completed test scenario: {scenario}")
+                except Exception as e:
+                    self.logger.error(f"Error in test scenario {scenario}: {e}")
+                
+                if app is not None:
+                    app.processEvents()
+        
+        # Keep visualization running once all results are in
+        if app is not None:
+            return app.exec()
 
     def _save_test_results(self, scenario: str, metrics: Dict):
-        """Save test results to both test and visualization data"""
-        # Save to test harness format
-        self.test_harness._save_scenario_results(scenario, metrics)
+        """Save test results to visualization data"""
+        # The harness has already streamed the scenario to its own results files
         
         # Save to visualization format
         self.data_handler.add_metrics({
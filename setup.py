@@ -40,5 +40,14 @@ setup(
             "flake8>=4.0.0",
             "mypy>=0.950",
         ],
+        "jit": [
+            "numba>=0.61.0",
+        ],
+        "msgpack": [
+            "msgpack>=1.0.0",
+        ],
+        "parquet": [
+            "pyarrow>=14.0.0",
+        ],
     },
 )
\ No newline at end of file
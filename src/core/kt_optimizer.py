@@ -4,6 +4,35 @@
 import math
 from dataclasses import dataclass
 
+import numpy as np
+
+from utils.jit import njit
+
+SIGMOID_POINTS = 1024
+
+def sigmoid_table(center: float, scale: float, x_max: float,
+                  points: int = SIGMOID_POINTS) -> np.ndarray:
+    """Sample the K(t) sigmoid 1 / (1 + exp((x - center) / scale)) on [0, x_max]"""
+    x = np.linspace(0.0, x_max, points)
+    return 1.0 / (1.0 + np.exp((x - center) / scale))
+
+@njit(cache=True)
+def sigmoid_lookup(x: float, x_max: float, table: np.ndarray) -> float:
+    """Linearly interpolate a table built by sigmoid_table, clamping at the ends"""
+    last = len(table) - 1
+    pos = x / x_max * last
+    if pos <= 0.0:
+        return table[0]
+    if pos >= last:
+        return table[last]
+    i = int(pos)
+    return table[i] + (table[i + 1] - table[i]) * (pos - i)
+
+# Dampening curve for the default critical threshold
+DEFAULT_LC = 8.0
+_DAMPENING_MAX = 4 * DEFAULT_LC
+_DAMPENING_TABLE = sigmoid_table(DEFAULT_LC, 4.0, _DAMPENING_MAX)
+
 @dataclass
 class SystemMetrics:
     """Normalized system metrics from test harness"""
@@ -12,41 +41,60 @@ class SystemMetrics:
     cores_active: float      # Percentage of cores actively used (0-1)
     stability_score: float   # System stability metric (0-1)
 
-def calculate_optimal_batch(metrics: SystemMetrics, Lc: float = 8.0):
-    """
-    Calculate optimal batch size using K(t) Framework formulas
-    
-    Parameters:
-    - metrics: Normalized system metrics from test harness
-    - Lc: Critical cognitive threshold (default 8.0)
-    """
+@njit("UniTuple(float64, 4)(float64, float64, float64, float64, float64)",
+      cache=True, fastmath=True)
+def _calc(cpu_efficiency: float, memory_pressure: float, cores_active: float,
+          stability_score: float, Lc: float):
+    """K(t) batch sizing kernel returning (batch, efficiency, load, stability)"""
     # Calculate base efficiency factor
-    base_efficiency = metrics.cpu_efficiency * (1 - metrics.memory_pressure)
+    base_efficiency = cpu_efficiency * (1 - memory_pressure)
     
     # Enhanced complexity scaling that adapts to system capabilities
-    complexity_factor = 1 + math.sqrt(metrics.cores_active) * 0.025
+    complexity_factor = 1 + math.sqrt(cores_active) * 0.025
     
     # Calculate cognitive load threshold
     cognitive_load = base_efficiency * complexity_factor
     
     # Apply K(t) Framework dampening
-    dampening = max(0.1, 1 / (1 + math.exp((cognitive_load - Lc) / 4)))
+    if Lc == DEFAULT_LC:
+        sigmoid = sigmoid_lookup(cognitive_load, _DAMPENING_MAX, _DAMPENING_TABLE)
+    else:
+        sigmoid = 1 / (1 + math.exp((cognitive_load - Lc) / 4))
+    dampening = max(0.1, sigmoid)
     
     # Calculate theoretical max batch size
     max_theoretical = int(Lc / (cognitive_load * dampening))
     
     # Apply stability adjustment
-    stability_factor = 0.5 + (metrics.stability_score * 0.5)  # Range 0.5-1.0
+    stability_factor = 0.5 + (stability_score * 0.5)  # Range 0.5-1.0
     optimal_batch = int(max_theoretical * stability_factor)
     
     # Calculate efficiency score for this batch size
     efficiency = 1 / (1 + math.exp((cognitive_load - Lc) / base_efficiency))
     
+    return float(optimal_batch), efficiency, cognitive_load, stability_factor
+
+def calculate_optimal_batch(metrics: SystemMetrics, Lc: float = DEFAULT_LC):
+    """
+    Calculate optimal batch size using K(t) Framework formulas
+    
+    Parameters:
+    - metrics: Normalized system metrics from test harness
+    - Lc: Critical cognitive threshold (default 8.0)
+    """
+    batch, efficiency, load, stability = _calc(
+        metrics.cpu_efficiency,
+        metrics.memory_pressure,
+        metrics.cores_active,
+        metrics.stability_score,
+        Lc
+    )
+    
     return {
-        'optimal_batch_size': optimal_batch,
+        'optimal_batch_size': int(batch),
         'efficiency_score': efficiency,
-        'load_factor': cognitive_load,
-        'stability_rating': stability_factor
+        'load_factor': load,
+        'stability_rating': stability
     }
 
 # Example using metrics from test harness
@@ -0,0 +1,24 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Compiled numeric kernels shared by the K(t) system monitors"""
+
+from typing import Tuple
+
+import numpy as np
+
+from utils.jit import njit
+
+@njit(cache=True)
+def cpu_pattern_stats(usage: np.ndarray) -> Tuple[float, float, float]:
+    """
+    Summarize per-core CPU usage (percent, float64)
+    
+    Returns (distribution_score, imbalance_score, active_cores), each
+    normalized to 0-1. A core counts as active above 10% usage.
+    """
+    n = usage.shape[0]
+    distribution = usage.sum() / (n * 100)
+    imbalance = (usage.max() - usage.min()) / 100
+    active = np.count_nonzero(usage > 10) / n
+    return float(distribution), float(imbalance), float(active)
@@ -0,0 +1,88 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Sampling-loop helpers shared by the K(t) system monitors"""
+
+import logging
+import sys
+import time
+
+import numpy as np
+
+# Seconds between flushes of the real-time status line
+STATUS_FLUSH_INTERVAL = 0.25
+
+# Minimum seconds between repeated sampling error log entries
+ERROR_LOG_INTERVAL = 5.0
+
+class StatusLine:
+    """
+    Real-time status line, rewritten in place on each sample
+
+    Writes go to stdout's buffer and are flushed at most every
+    flush_interval seconds. Nothing is written unless stdout is a terminal;
+    callers can check enabled to skip building the values.
+    """
+
+    def __init__(self, fmt: str, flush_interval: float = STATUS_FLUSH_INTERVAL):
+        self._format = ("\r" + fmt).format
+        self.flush_interval = flush_interval
+        self.enabled = sys.stdout.isatty()
+        self._last_flush = time.monotonic()
+
+    def write(self, *values):
+        """Overwrite the status line with fmt filled in from values"""
+        if not self.enabled:
+            return
+
+        sys.stdout.write(self._format(*values))
+        now = time.monotonic()
+        if now - self._last_flush >= self.flush_interval:
+            sys.stdout.flush()
+            self._last_flush = now
+
+class ErrorThrottle:
+    """Error logger that drops repeats within interval seconds of the last entry"""
+
+    def __init__(self, logger: logging.Logger, interval: float = ERROR_LOG_INTERVAL):
+        self.logger = logger
+        self.interval = interval
+        self._last_log_t = float('-inf')
+
+    def error(self, message: str):
+        now = time.monotonic()
+        if now - self._last_log_t > self.interval:
+            self.logger.error(message)
+            self._last_log_t = now
+
+class PerCpuWindow:
+    """Per-CPU usage for the most recent max_samples samples, in a float32 ring"""
+
+    def __init__(self, max_samples: int, cpu_count: int):
+        self.max_samples = max_samples
+        self._buf = np.empty((max_samples, cpu_count), dtype=np.float32)
+        self._n = 0
+
+    def append(self, cpu_percent):
+        self._buf[self._n % self.max_samples, :] = cpu_percent
+        self._n += 1
+
+    def clear(self):
+        self._n = 0
+
+    @property
+    def written(self) -> int:
+        """Samples appended since the last clear, including those out of the window"""
+        return self._n
+
+    def __getitem__(self, sample_idx: int) -> np.ndarray:
+        """Per-CPU usage for a sample, indexed by sampling order (0 is the first)"""
+        if not max(0, self._n - self.max_samples) <= sample_idx < self._n:
+            raise IndexError(f"Sample {sample_idx} is not in the current window")
+        return self._buf[sample_idx % self.max_samples]
+
+    def window(self) -> np.ndarray:
+        """Per-CPU usage for the current window, oldest sample first"""
+        if self._n <= self.max_samples:
+            return self._buf[:self._n]
+        return np.roll(self._buf, -(self._n % self.max_samples), axis=0)
@@ -1,5 +1,6 @@
 import psutil
 import time
+import math
 from typing import Dict, List, Optional, Tuple
 import logging
 from datetime import datetime
@@ -7,6 +8,16 @@ import json
 from pathlib import Path
 import numpy as np
 from dataclasses import dataclass
+from collections import Counter, deque
+
+from core.kt_optimizer import sigmoid_lookup, sigmoid_table
+from monitoring._kernels import cpu_pattern_stats
+from monitoring._sampling import ErrorThrottle, PerCpuWindow, StatusLine
+from utils.jit import njit
+from utils.jsonio import write_json
+from utils.logger import configure_logging
+
+_STATUS_FMT = "Workload: {:>12} ({:>4.2f}) | Efficiency: {:>5.2f} | Load: {:>5.2f}"
 
 @dataclass
 class KTParameters:
@@ -17,14 +28,90 @@ class KTParameters:
     efficiency_uncertainty: float = 0.05
     sync_cost: float = 0.22
 
+@dataclass
+class MetricSample:
+    """Single monitor sample with K(t) framework metrics"""
+    __slots__ = ('t_ns', 'cpu_percent', 'memory_percent',
+                 'memory_available', 'memory_used', 'memory_pressure',
+                 'cognitive_load', 'efficiency', 'cpu_distribution',
+                 'workload', 'confidence')
+    
+    t_ns: int                   # Wall-clock time from time.time_ns()
+    cpu_percent: float          # Mean over all CPUs; per-core values via per_cpu()
+    memory_percent: float
+    memory_available: int
+    memory_used: int
+    memory_pressure: float
+    cognitive_load: float
+    efficiency: float
+    cpu_distribution: Dict
+    workload: str
+    confidence: float
+    
+    @property
+    def timestamp(self) -> str:
+        """ISO formatted sample time, built only when needed"""
+        return datetime.fromtimestamp(self.t_ns / 1e9).isoformat()
+
+@njit(cache=True, fastmath=True)
+def _kt_load(cpu_load: float, mem_pressure: float, Lc: float, sync_cost: float) -> float:
+    """Cognitive load kernel (cpu_load and mem_pressure normalized to 0-1)"""
+    # Base load calculation
+    base_load = (cpu_load * 0.7 + mem_pressure * 0.3) * Lc
+    
+    # Enhanced sync cost with better scaling
+    sync = sync_cost * math.log2(cpu_load * 100 + 1)
+    
+    # Improved complexity scaling
+    complexity_factor = 1 + math.sqrt(mem_pressure) * 0.025
+    
+    # Apply soft dampening
+    load = (base_load + sync) * complexity_factor
+    dampening = max(0.1, 1 / (1 + math.exp((load - Lc * 1.5) / 4)))
+    
+    return max(0.001, load * dampening)
+
+@njit(cache=True, fastmath=True)
+def _kt_eff(cpu_pct: float, mem_pct: float, cog_load: float, sig_max: float,
+            sig_table: np.ndarray) -> float:
+    """Efficiency kernel (cpu_pct and mem_pct in percent)"""
+    cpu_efficiency = 1 - (cpu_pct / 100.0)
+    memory_efficiency = 1 - (mem_pct / 100.0)
+    
+    # K(t) framework efficiency calculation, read from the precomputed sigmoid
+    kt_efficiency = sigmoid_lookup(cog_load, sig_max, sig_table)
+    
+    # Combined efficiency score
+    return (cpu_efficiency * 0.4 + memory_efficiency * 0.3 + kt_efficiency * 0.3)
+
+def _warmup_jit():
+    """Compile the monitor kernels, or load them from Numba's cache, up front"""
+    params = KTParameters()
+    sig_max = 4 * params.Lc
+    _kt_load(0.5, 0.5, params.Lc, params.sync_cost)
+    _kt_eff(50.0, 50.0, 4.0, sig_max,
+            sigmoid_table(params.Lc, params.efficiency_coefficient, sig_max))
+    cpu_pattern_stats(np.zeros(4, dtype=np.float64))
+
 class KTIntegratedMonitor:
     """System monitor with integrated K(t) framework optimization"""
     
-    def __init__(self, sampling_rate: float = 1.0, log_dir: str = "logs"):
+    def __init__(self, sampling_rate: float = 1.0, log_dir: str = "logs",
+                 max_samples: int = 3600):
         self.sampling_rate = sampling_rate
+        self.max_samples = max_samples
         self.kt_params = KTParameters()
         self.logger = logging.getLogger(__name__)
         
+        # Efficiency sigmoid is fixed for the session, so sample it once
+        self._sig_max = 4 * self.kt_params.Lc
+        self._sig_table = sigmoid_table(self.kt_params.Lc,
+                                        self.kt_params.efficiency_coefficient,
+                                        self._sig_max)
+        
+        # Compile kernels before sampling so the first sample has no JIT latency
+        _warmup_jit()
+        
         # System discovery
         self.system_info = self._discover_system()
         
@@ -34,12 +121,26 @@ class KTIntegratedMonitor:
         # Load baseline patterns
         self.baseline_patterns = self._load_baseline_patterns()
         
-        # Initialize metrics store
+        # Initialize metrics store; metrics keep the most recent max_samples
         self.current_session = {
-            'metrics': [],
+            'metrics': deque(maxlen=max_samples),
             'patterns': [],
             'optimizations': []
         }
+        
+        # Rolling K(t) metric buffers used by session analysis
+        self._eff_buf = np.empty(max_samples, dtype=np.float64)
+        self._load_buf = np.empty(max_samples, dtype=np.float64)
+        self._per_cpu = PerCpuWindow(max_samples, self.system_info['thread_count'])
+        self._workload_counts = Counter()
+        
+        # Last good sample, returned again if psutil fails, and its per-CPU reading
+        self._last_sample: Optional[MetricSample] = None
+        self._last_cpu_percent: List[float] = []
+        self._sampling_errors = ErrorThrottle(self.logger)
+        
+        # Prime psutil's CPU counters so sampling never blocks
+        psutil.cpu_percent(interval=None, percpu=True)
     
     def _discover_system(self) -> Dict:
         """Discover system capabilities"""
@@ -53,24 +154,15 @@ class KTIntegratedMonitor:
     def _setup_logging(self, log_dir: str):
         """Set up logging with integrated K(t) metrics"""
         log_path = Path(log_dir)
-        log_path.mkdir(exist_ok=True)
-        
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        log_file = log_path / f"kt_monitor_{timestamp}.log"
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        configure_logging(log_path / f"kt_monitor_{timestamp}.log")
         
         self.logger.info(f"System discovered: {json.dumps(self.system_info, indent=2)}")
     
     def _load_baseline_patterns(self) -> Dict:
         """Load baseline pattern data"""
+        self._baseline_names = ()
+        self._baseline_eff = np.empty(0, dtype=np.float64)
         try:
             patterns = {
                 'idle': {'efficiency': 0.016, 'stability': 0.864, 'memory': 0.213},
@@ -78,112 +170,104 @@ class KTIntegratedMonitor:
                 'light_gaming': {'efficiency': 0.078, 'stability': 0.719, 'memory': 0.272},
                 'med_gaming': {'efficiency': 0.449, 'stability': 0.365, 'memory': 0.287}
             }
+            
+            # Column view of the baselines for workload detection
+            self._baseline_names = tuple(patterns.keys())
+            self._baseline_eff = np.fromiter(
+                (p['efficiency'] for p in patterns.values()),
+                dtype=np.float64, count=len(patterns)
+            )
             return patterns
         except Exception as e:
             self.logger.error(f"Error loading baseline patterns: {str(e)}")
             return {}
     
-    def _calculate_cognitive_load(self, metrics: Dict) -> float:
+    def _calculate_cognitive_load(self, cpu_percent: float, memory_percent: float) -> float:
         """Calculate cognitive load using K(t) framework"""
-        cpu_load = metrics['cpu']['overall_percent'] / 100.0
-        memory_pressure = metrics['memory']['percent_used'] / 100.0
-        
-        # Base load calculation
-        base_load = (cpu_load * 0.7 + memory_pressure * 0.3) * self.kt_params.Lc
-        
-        # Enhanced sync cost with better scaling
-        sync_cost = self.kt_params.sync_cost * np.log2(cpu_load * 100 + 1)
-        
-        # Improved complexity scaling
-        complexity_factor = 1 + np.sqrt(memory_pressure) * 0.025
-        
-        # Apply soft dampening
-        load = (base_load + sync_cost) * complexity_factor
-        dampening = max(0.1, 1 / (1 + np.exp((load - self.kt_params.Lc * 1.5) / 4)))
-        
-        return max(0.001, load * dampening)
+        return _kt_load(cpu_percent / 100.0,
+                        memory_percent / 100.0,
+                        self.kt_params.Lc,
+                        self.kt_params.sync_cost)
     
-    def _calculate_efficiency(self, metrics: Dict, cognitive_load: float) -> float:
+    def _calculate_efficiency(self, cpu_percent: float, memory_percent: float,
+                              cognitive_load: float) -> float:
         """Calculate system efficiency using K(t) framework"""
-        cpu_efficiency = 1 - (metrics['cpu']['overall_percent'] / 100.0)
-        memory_efficiency = 1 - (metrics['memory']['percent_used'] / 100.0)
-        
-        # K(t) framework efficiency calculation
-        kt_efficiency = 1 / (1 + np.exp((cognitive_load - self.kt_params.Lc) / 
-                                      self.kt_params.efficiency_coefficient))
-        
-        # Combined efficiency score
-        return (cpu_efficiency * 0.4 + memory_efficiency * 0.3 + kt_efficiency * 0.3)
+        return _kt_eff(cpu_percent,
+                       memory_percent,
+                       cognitive_load,
+                       self._sig_max,
+                       self._sig_table)
     
-    def _detect_workload_type(self, metrics: Dict) -> Tuple[str, float]:
+    def _detect_workload_type(self, current_efficiency: float) -> Tuple[str, float]:
         """Detect current workload type based on patterns"""
-        current_efficiency = metrics['patterns']['efficiency']
-        
         # Calculate distance to each baseline pattern
-        distances = {}
-        for workload, pattern in self.baseline_patterns.items():
-            distance = abs(pattern['efficiency'] - current_efficiency)
-            distances[workload] = distance
+        distances = np.abs(self._baseline_eff - current_efficiency)
         
         # Find closest match
-        best_match = min(distances.items(), key=lambda x: x[1])
-        return best_match[0], 1.0 - (best_match[1] / max(distances.values()))
+        best = int(distances.argmin())
+        return self._baseline_names[best], 1.0 - float(distances[best]) / float(distances.max())
     
-    def get_system_metrics(self) -> Dict:
-        """Get comprehensive system metrics with K(t) framework integration"""
+    def get_system_metrics(self) -> Optional[MetricSample]:
+        """
+        Get comprehensive system metrics with K(t) framework integration
+        
+        If psutil fails, the previous sample is returned unchanged (None before
+        the first good sample), so callers can detect a stale read by identity.
+        """
         try:
             # Get base metrics
-            cpu_percent = psutil.cpu_percent(interval=0.1, percpu=True)
+            t_ns = time.time_ns()
+            cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
             memory = psutil.virtual_memory()
-            
-            metrics = {
-                'timestamp': datetime.now().isoformat(),
-                'cpu': {
-                    'overall_percent': sum(cpu_percent) / len(cpu_percent),
-                    'per_cpu_percent': cpu_percent
-                },
-                'memory': {
-                    'percent_used': memory.percent,
-                    'available_bytes': memory.available,
-                    'used_bytes': memory.used
-                }
-            }
-            
-            # Calculate K(t) framework metrics
-            cognitive_load = self._calculate_cognitive_load(metrics)
-            efficiency = self._calculate_efficiency(metrics, cognitive_load)
-            
-            # Add pattern analysis
-            metrics['patterns'] = {
-                'cognitive_load': cognitive_load,
-                'efficiency': efficiency,
-                'cpu_distribution': self._analyze_cpu_pattern(cpu_percent),
-                'memory_pressure': memory.percent / 100.0
-            }
-            
-            # Detect workload type
-            workload_type, confidence = self._detect_workload_type(metrics)
-            metrics['workload'] = {
-                'type': workload_type,
-                'confidence': confidence
-            }
-            
-            return metrics
-            
-        except Exception as e:
-            self.logger.error(f"Error getting metrics: {str(e)}")
-            return {}
+        except psutil.Error as e:
+            self._sampling_errors.error(f"Error getting metrics: {e}")
+            return self._last_sample
+        
+        self._last_sample = self._build_sample(t_ns, cpu_percent, memory)
+        self._last_cpu_percent = cpu_percent
+        return self._last_sample
+    
+    def _build_sample(self, t_ns: int, cpu_percent: List[float], memory) -> MetricSample:
+        """Compute K(t) metrics for a psutil reading"""
+        cpu_overall = sum(cpu_percent) / len(cpu_percent)
+        
+        # Calculate K(t) framework metrics
+        cognitive_load = self._calculate_cognitive_load(cpu_overall, memory.percent)
+        efficiency = self._calculate_efficiency(cpu_overall, memory.percent, cognitive_load)
+        
+        # Detect workload type
+        workload_type, confidence = self._detect_workload_type(efficiency)
+        
+        return MetricSample(
+            t_ns=t_ns,
+            cpu_percent=cpu_overall,
+            memory_percent=memory.percent,
+            memory_available=memory.available,
+            memory_used=memory.used,
+            memory_pressure=memory.percent / 100.0,
+            cognitive_load=cognitive_load,
+            efficiency=efficiency,
+            cpu_distribution=self._analyze_cpu_pattern(cpu_percent),
+            workload=workload_type,
+            confidence=confidence
+        )
+    
+    def per_cpu(self, sample_idx: int) -> np.ndarray:
+        """Per-CPU usage for a sample, indexed by sampling order (0 is the first)"""
+        return self._per_cpu[sample_idx]
     
     def _analyze_cpu_pattern(self, cpu_percents: List[float]) -> Dict:
         """Analyze CPU usage patterns"""
         if not cpu_percents:
             return {}
             
-        sorted_usage = sorted(cpu_percents)
+        distribution, imbalance, active = cpu_pattern_stats(
+            np.asarray(cpu_percents, dtype=np.float64)
+        )
         return {
-            'distribution_score': sum(sorted_usage) / (len(sorted_usage) * 100),
-            'imbalance_score': (max(sorted_usage) - min(sorted_usage)) / 100 if sorted_usage else 0,
-            'active_cores': sum(1 for x in cpu_percents if x > 10) / len(cpu_percents)
+            'distribution_score': distribution,
+            'imbalance_score': imbalance,
+            'active_cores': active
         }
     
     def monitor_system(self, duration: int = 60) -> Dict:
@@ -191,22 +275,26 @@ class KTIntegratedMonitor:
         print(f"\nCollecting system patterns for {duration} seconds...")
         print("Press Ctrl+C to stop early\n")
         
-        start_time = time.time()
+        start_time = time.monotonic()
+        next_sample = start_time
+        status = StatusLine(_STATUS_FMT)
         
         try:
-            while time.time() - start_time < duration:
-                metrics = self.get_system_metrics()
-                self.current_session['metrics'].append(metrics)
+            while time.monotonic() - start_time < duration:
+                previous = self._last_sample
+                sample = self.get_system_metrics()
                 
-                # Real-time display
-                patterns = metrics['patterns']
-                workload = metrics['workload']
+                # A failed read hands back the previous sample; don't record it twice
+                if sample is not None and sample is not previous:
+                    self._record_sample(sample, self._last_cpu_percent)
+                    
+                    # Real-time display
+                    status.write(sample.workload, sample.confidence,
+                                 sample.efficiency, sample.cognitive_load)
                 
-                print(f"\rWorkload: {workload['type']:>12} ({workload['confidence']:>4.2f}) | "
-                      f"Efficiency: {patterns['efficiency']:>5.2f} | "
-                      f"Load: {patterns['cognitive_load']:>5.2f}", end='')
-                
-                time.sleep(self.sampling_rate)
+                # Sleep to the next absolute deadline so loop overhead doesn't drift
+                next_sample += self.sampling_rate
+                time.sleep(max(0.0, next_sample - time.monotonic()))
         
         except KeyboardInterrupt:
             print("\n\nMonitoring stopped by user")
@@ -220,37 +308,53 @@ class KTIntegratedMonitor:
             
         return {}
     
+    def _record_sample(self, sample: MetricSample, cpu_percent: List[float]):
+        """Append a sample to the bounded session window and K(t) buffers"""
+        slot = self._per_cpu.written % self.max_samples
+        self._eff_buf[slot] = sample.efficiency
+        self._load_buf[slot] = sample.cognitive_load
+        self._per_cpu.append(cpu_percent)
+        
+        metrics = self.current_session['metrics']
+        if len(metrics) == metrics.maxlen:
+            evicted = metrics[0].workload
+            self._workload_counts[evicted] -= 1
+            if not self._workload_counts[evicted]:
+                del self._workload_counts[evicted]
+        
+        metrics.append(sample)
+        self._workload_counts[sample.workload] += 1
+    
     def _analyze_session(self) -> Dict:
         """Analyze monitoring session"""
-        metrics = self.current_session['metrics']
+        # Counts come from the recorded samples, so reads that were never
+        # recorded can't skew the averages
+        recorded = self._per_cpu.written
+        n = len(self.current_session['metrics'])
+        efficiency = self._eff_buf[:n]
+        cognitive_load = self._load_buf[:n]
         
         return {
-            'duration': len(metrics) * self.sampling_rate,
-            'samples': len(metrics),
+            'duration': recorded * self.sampling_rate,
+            'samples': recorded,
             'patterns': {
                 'efficiency': {
-                    'average': np.mean([m['patterns']['efficiency'] for m in metrics]),
-                    'stability': 1 - np.std([m['patterns']['efficiency'] for m in metrics])
+                    'average': efficiency.mean(),
+                    'stability': 1 - efficiency.std()
                 },
                 'cognitive_load': {
-                    'average': np.mean([m['patterns']['cognitive_load'] for m in metrics]),
-                    'stability': 1 - np.std([m['patterns']['cognitive_load'] for m in metrics])
+                    'average': cognitive_load.mean(),
+                    'stability': 1 - cognitive_load.std()
                 },
                 'workload_distribution': self._analyze_workload_distribution()
             }
         }
     
     def _analyze_workload_distribution(self) -> Dict:
-        """Analyze workload type distribution"""
-        workloads = [m['workload']['type'] for m in self.current_session['metrics']]
-        total = len(workloads)
-        
-        distribution = {}
-        for workload in set(workloads):
-            count = workloads.count(workload)
-            distribution[workload] = count / total
+        """Analyze workload type distribution over the session window"""
+        total = len(self.current_session['metrics'])
         
-        return distribution
+        return {workload: count / total for workload, count in self._workload_counts.items()}
     
     def _save_session(self, analysis: Dict):
         """Save session analysis"""
@@ -258,12 +362,11 @@ class KTIntegratedMonitor:
         save_path = Path('data')
         save_path.mkdir(exist_ok=True)
         
-        with open(save_path / f'kt_session_{timestamp}.json', 'w') as f:
-            json.dump({
-                'timestamp': timestamp,
-                'system_info': self.system_info,
-                'analysis': analysis
-            }, f, indent=2)
+        write_json(save_path / f'kt_session_{timestamp}.json', {
+            'timestamp': timestamp,
+            'system_info': self.system_info,
+            'analysis': analysis
+        })
     
     def _print_analysis(self, analysis: Dict):
         """Print user-friendly analysis"""
@@ -2,21 +2,46 @@ import psutil
 import time
 from typing import Dict, List, Optional
 import logging
+import logging.handlers
 from datetime import datetime
 import json
 from pathlib import Path
 import uuid
+import numpy as np
+
+from monitoring._kernels import cpu_pattern_stats
+from monitoring._sampling import ErrorThrottle, PerCpuWindow, StatusLine
+from utils.jsonio import dumps_line, write_json
+from utils.sysinfo import CPU_FREQ, LOADAVG
+
+_STATUS_FMT = "Efficiency: {:>5.2f} | Balance: {:>5.2f} | Load: {:>5.1f}%"
+
+def _warmup_jit():
+    """Compile the pattern kernel, or load it from Numba's cache, up front"""
+    cpu_pattern_stats(np.zeros(4, dtype=np.float64))
+
+class _SessionFileHandler(logging.FileHandler):
+    """File handler that opens its file, and creates its directory, on first write"""
+    
+    def __init__(self, filename: Path):
+        super().__init__(filename, delay=True)
+    
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
 
 class KtSystemMonitor:
     """Universal system monitor for K(t) framework optimization with session management"""
     
-    def __init__(self, sampling_rate: float = 1.0):
+    def __init__(self, sampling_rate: float = 1.0, max_samples: int = 3600):
         self.sampling_rate = sampling_rate
+        self.max_samples = max_samples
         self.session_id = str(uuid.uuid4())[:8]  # Generate unique session ID
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        # Create session-specific directories
-        self.session_dir = self._create_session_directory()
+        # Session directories are created lazily on first write
+        self._session_path = Path('kt_monitor_sessions') / f"{self.timestamp}_{self.session_id}"
+        self._session_dir: Optional[Path] = None
         self.logger = self._setup_logging()
         
         # System capabilities discovery
@@ -25,11 +50,30 @@ class KtSystemMonitor:
         
         # Initialize pattern storage
         self.observed_patterns = []
+        
+        # Rolling pattern buffers used by pattern analysis
+        self._dist_buf = np.empty(max_samples, dtype=np.float64)
+        self._mem_buf = np.empty(max_samples, dtype=np.float64)
+        self._per_cpu = PerCpuWindow(max_samples, self.system_info['thread_count'])
+        self._n = 0
+        
+        # Last good sample, returned again if psutil fails
+        self._last_metrics: Dict = {}
+        self._sampling_errors = ErrorThrottle(self.logger)
+        
+        # Prime psutil's CPU counters so sampling never blocks
+        psutil.cpu_percent(interval=None, percpu=True)
+    
+    @property
+    def session_dir(self) -> Path:
+        """Session directory, created on first access"""
+        if self._session_dir is None:
+            self._session_dir = self._create_session_directory()
+        return self._session_dir
     
     def _create_session_directory(self) -> Path:
         """Create a unique directory for this monitoring session"""
-        base_dir = Path('kt_monitor_sessions')
-        session_dir = base_dir / f"{self.timestamp}_{self.session_id}"
+        session_dir = self._session_path
         session_dir.mkdir(parents=True, exist_ok=True)
         
         # Create subdirectories
@@ -47,18 +91,22 @@ class KtSystemMonitor:
         file_formatter = logging.Formatter('%(asctime)s - %(message)s')
         console_formatter = logging.Formatter('%(message)s')
         
-        # File handler
-        file_handler = logging.FileHandler(
-            self.session_dir / 'logs' / f'monitor_{self.session_id}.log'
+        # File handler, buffered so nothing touches disk until records pile up,
+        # an error is logged, or logging shuts down
+        file_handler = _SessionFileHandler(
+            self._session_path / 'logs' / f'monitor_{self.session_id}.log'
         )
         file_handler.setFormatter(file_formatter)
+        buffered_handler = logging.handlers.MemoryHandler(
+            capacity=100, flushLevel=logging.ERROR, target=file_handler
+        )
         
         # Console handler
         console_handler = logging.StreamHandler()
         console_handler.setFormatter(console_formatter)
         
         # Add handlers
-        logger.addHandler(file_handler)
+        logger.addHandler(buffered_handler)
         logger.addHandler(console_handler)
         
         return logger
@@ -70,7 +118,6 @@ class KtSystemMonitor:
             'thread_count': psutil.cpu_count(logical=True),
             'memory_total': psutil.virtual_memory().total,
             'has_smt': psutil.cpu_count(logical=True) > psutil.cpu_count(logical=False),
-            'platform': psutil.sys_info() if hasattr(psutil, 'sys_info') else None,
             'session_info': {
                 'id': self.session_id,
                 'timestamp': self.timestamp
@@ -84,54 +131,75 @@ class KtSystemMonitor:
         self.logger.info(f"System discovered: {json.dumps(self.system_info, indent=2)}")
     
     def get_system_metrics(self) -> Dict:
-        """Get universal system metrics"""
+        """
+        Get universal system metrics
+        
+        If psutil fails, the previous sample is returned unchanged ({} before
+        the first good sample), so callers can detect a stale read by identity.
+        """
         try:
             # CPU metrics
-            cpu_percent = psutil.cpu_percent(interval=0.1, percpu=True)
-            cpu_freq = psutil.cpu_freq(percpu=True) if hasattr(psutil, 'cpu_freq') else None
+            cpu_percent = psutil.cpu_percent(interval=None, percpu=True)
+            cpu_freq = CPU_FREQ(percpu=True) if CPU_FREQ else None
             
             # Memory metrics
             memory = psutil.virtual_memory()
             
             # System load
-            load = psutil.getloadavg() if hasattr(psutil, 'getloadavg') else None
-            
-            metrics = {
-                'timestamp': datetime.now().isoformat(),
-                'session_id': self.session_id,
-                'cpu': {
-                    'overall_percent': sum(cpu_percent) / len(cpu_percent),
-                    'per_cpu_percent': cpu_percent,
-                    'frequencies': cpu_freq,
-                    'load': load
-                },
-                'memory': {
-                    'percent_used': memory.percent,
-                    'available_bytes': memory.available,
-                    'used_bytes': memory.used
-                },
-                'patterns': {
-                    'cpu_distribution': self._analyze_cpu_pattern(cpu_percent),
-                    'memory_pressure': memory.percent / 100.0
-                }
+            load = LOADAVG() if LOADAVG else None
+        except psutil.Error as e:
+            self._sampling_errors.error(f"Error getting metrics: {e}")
+            return self._last_metrics
+        
+        self._last_metrics = self._build_metrics(cpu_percent, cpu_freq, memory, load)
+        return self._last_metrics
+    
+    def _build_metrics(self, cpu_percent: List[float], cpu_freq, memory, load) -> Dict:
+        """Record a psutil reading in the pattern buffers and build its sample"""
+        cpu_distribution = self._analyze_cpu_pattern(cpu_percent)
+        memory_pressure = memory.percent / 100.0
+        
+        slot = self._n % self.max_samples
+        self._dist_buf[slot] = cpu_distribution['distribution_score']
+        self._mem_buf[slot] = memory_pressure
+        self._per_cpu.append(cpu_percent)
+        self._n += 1
+        
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'session_id': self.session_id,
+            'cpu': {
+                'overall_percent': sum(cpu_percent) / len(cpu_percent),
+                'frequencies': cpu_freq,
+                'load': load
+            },
+            'memory': {
+                'percent_used': memory.percent,
+                'available_bytes': memory.available,
+                'used_bytes': memory.used
+            },
+            'patterns': {
+                'cpu_distribution': cpu_distribution,
+                'memory_pressure': memory_pressure
             }
-            
-            return metrics
-            
-        except Exception as e:
-            self.logger.error(f"Error getting metrics: {str(e)}")
-            return {}
+        }
+    
+    def per_cpu(self, sample_idx: int) -> np.ndarray:
+        """Per-CPU usage for a sample, indexed by sampling order (0 is the first)"""
+        return self._per_cpu[sample_idx]
     
     def _analyze_cpu_pattern(self, cpu_percents: List[float]) -> Dict:
         """Analyze CPU usage patterns"""
         if not cpu_percents:
             return {}
             
-        sorted_usage = sorted(cpu_percents)
+        distribution, imbalance, active = cpu_pattern_stats(
+            np.asarray(cpu_percents, dtype=np.float64)
+        )
         return {
-            'distribution_score': sum(sorted_usage) / (len(sorted_usage) * 100),
-            'imbalance_score': (max(sorted_usage) - min(sorted_usage)) / 100 if sorted_usage else 0,
-            'active_cores': sum(1 for x in cpu_percents if x > 10) / len(cpu_percents)
+            'distribution_score': distribution,
+            'imbalance_score': imbalance,
+            'active_cores': active
         }
     
     def monitor_system(self, duration: int = 60, description: str = "") -> Dict:
@@ -149,27 +217,43 @@ class KtSystemMonitor:
         print(f"Session ID: {self.session_id}")
         print("Press Ctrl+C to stop early\n")
         
-        samples = []
-        start_time = time.time()
+        samples = 0
+        self._n = 0
+        self._per_cpu.clear()
+        samples_file = self.session_dir / 'data' / f'raw_samples_{self.session_id}.ndjson'
+        start_time = time.monotonic()
+        next_sample = start_time
+        status = StatusLine(_STATUS_FMT)
         
-        try:
-            while time.time() - start_time < duration:
-                metrics = self.get_system_metrics()
-                samples.append(metrics)
-                
-                # Real-time pattern indicators
-                patterns = metrics.get('patterns', {})
-                distribution = patterns.get('cpu_distribution', {})
-                
-                print(f"\rEfficiency: {distribution.get('distribution_score', 0):>5.2f} | "
-                      f"Balance: {1 - distribution.get('imbalance_score', 0):>5.2f} | "
-                      f"Load: {metrics['cpu']['overall_percent']:>5.1f}%", end='')
-                
-                time.sleep(self.sampling_rate)
-        
-        except KeyboardInterrupt:
-            print("\n\nMonitoring stopped by user")
-            self.logger.info("Monitoring stopped by user")
+        # Raw samples are streamed to disk as they are taken rather than
+        # held in memory until the end of the session
+        with open(samples_file, 'wb', buffering=1 << 20) as samples_fp:
+            try:
+                while time.monotonic() - start_time < duration:
+                    previous = self._last_metrics
+                    metrics = self.get_system_metrics()
+                    
+                    # A failed read hands back the previous sample; don't record it twice
+                    if metrics is not previous:
+                        samples += 1
+                        samples_fp.write(dumps_line(metrics))
+                    
+                    # Real-time pattern indicators
+                    if status.enabled and metrics:
+                        patterns = metrics.get('patterns', {})
+                        distribution = patterns.get('cpu_distribution', {})
+                        
+                        status.write(distribution.get('distribution_score', 0),
+                                     1 - distribution.get('imbalance_score', 0),
+                                     metrics['cpu']['overall_percent'])
+                    
+                    # Sleep to the next absolute deadline so loop overhead doesn't drift
+                    next_sample += self.sampling_rate
+                    time.sleep(max(0.0, next_sample - time.monotonic()))
+            
+            except KeyboardInterrupt:
+                print("\n\nMonitoring stopped by user")
+                self.logger.info("Monitoring stopped by user")
         
         # Analyze patterns
         if samples:
@@ -180,46 +264,39 @@ class KtSystemMonitor:
             
         return {}
     
-    def _analyze_patterns(self, samples: List[Dict]) -> Dict:
+    def _analyze_patterns(self, samples: int) -> Dict:
         """Analyze collected patterns"""
-        cpu_distributions = [s['patterns']['cpu_distribution']['distribution_score'] 
-                           for s in samples if 'patterns' in s]
-        memory_pressure = [s['patterns']['memory_pressure'] 
-                          for s in samples if 'patterns' in s]
+        n = min(self._n, self.max_samples)
+        cpu_distributions = self._dist_buf[:n]
+        memory_pressure = self._mem_buf[:n]
         
         analysis = {
             'session_id': self.session_id,
             'timestamp': self.timestamp,
-            'duration': len(samples) * self.sampling_rate,
-            'samples': len(samples),
+            'duration': samples * self.sampling_rate,
+            'samples': samples,
             'patterns': {
                 'cpu_efficiency': {
-                    'average': sum(cpu_distributions) / len(cpu_distributions),
-                    'stability': 1 - (max(cpu_distributions) - min(cpu_distributions))
+                    'average': cpu_distributions.mean(),
+                    'stability': 1 - np.ptp(cpu_distributions)
                 },
                 'memory_patterns': {
-                    'average_pressure': sum(memory_pressure) / len(memory_pressure),
-                    'pressure_stability': 1 - (max(memory_pressure) - min(memory_pressure))
+                    'average_pressure': memory_pressure.mean(),
+                    'pressure_stability': 1 - np.ptp(memory_pressure)
                 }
             }
         }
         
-        # Save raw samples for detailed analysis
-        self._save_raw_samples(samples)
-        
         return analysis
     
-    def _save_raw_samples(self, samples: List[Dict]):
-        """Save raw sample data for detailed analysis"""
-        samples_file = self.session_dir / 'data' / f'raw_samples_{self.session_id}.json'
-        with open(samples_file, 'w') as f:
-            json.dump(samples, f, indent=2)
-    
     def _save_patterns(self, analysis: Dict):
         """Save pattern analysis"""
         analysis_file = self.session_dir / 'data' / f'pattern_analysis_{self.session_id}.json'
-        with open(analysis_file, 'w') as f:
-            json.dump(analysis, f, indent=2)
+        write_json(analysis_file, analysis)
+        
+        # Per-CPU usage is kept out of the raw samples and saved as one array
+        np.save(self.session_dir / 'data' / f'per_cpu_{self.session_id}.npy',
+                self._per_cpu.window())
     
     def _print_analysis(self, analysis: Dict):
         """Print user-friendly analysis"""
@@ -244,6 +321,9 @@ class KtSystemMonitor:
 
 def main():
     """Run a monitoring session"""
+    # Compile kernels before sampling so the first sample has no JIT latency
+    _warmup_jit()
+    
     monitor = KtSystemMonitor(sampling_rate=1.0)
     monitor.monitor_system(
         duration=30,
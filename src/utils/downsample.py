@@ -0,0 +1,44 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Series downsampling for K(t) Framework charts.
+
+Largest-Triangle-Three-Buckets keeps the first and last points and, from
+each bucket in between, the point that forms the largest triangle with the
+point already kept and the average of the next bucket. Peaks and troughs
+survive, so a chart drawn from the result looks like one drawn from every
+sample.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Downsample the series (x, y) to at most threshold points"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x, y
+
+    # threshold - 2 buckets cover every point between the first and the last
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.intp)
+    kept = np.empty(threshold, dtype=np.intp)
+    kept[0] = 0
+    kept[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        if i < threshold - 3:
+            next_x = x[end:edges[i + 2]].mean()
+            next_y = y[end:edges[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # Twice the triangle area; the factor doesn't change the argmax
+        area = np.abs((x[a] - next_x) * (y[start:end] - y[a])
+                      - (x[a] - x[start:end]) * (next_y - y[a]))
+        a = start + int(area.argmax())
+        kept[i + 1] = a
+
+    return x[kept], y[kept]
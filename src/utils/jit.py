@@ -0,0 +1,32 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Optional Numba support for K(t) Framework kernels.
+
+Numba is not a hard dependency. When it is missing, ``njit`` returns the
+decorated function unchanged and ``prange`` is plain ``range``, so kernels
+still run as ordinary Python.
+
+Kernels are compiled with ``cache=True`` and entrypoints warm them before
+sampling starts, so only the first run on a machine pays full compilation.
+Numba writes its cache next to the source by default; when that is not
+writable or not persistent (CI runners, installed packages), point
+``NUMBA_CACHE_DIR`` at a writable directory that survives between runs.
+"""
+
+try:
+    from numba import njit, prange
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        """Stand-in for ``numba.njit`` when Numba is not installed"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
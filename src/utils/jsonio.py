@@ -0,0 +1,62 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""JSON input and output for K(t) Framework session data.
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Both paths produce the same layout: indented for whole files,
+compact for JSONL records.
+"""
+
+import json
+import mmap
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+    HAS_ORJSON = True
+    loads = orjson.loads
+except ImportError:
+    HAS_ORJSON = False
+    loads = json.loads
+
+def _default(obj: Any) -> Any:
+    """Serialize tuple subclasses (psutil named tuples) as lists, like json does"""
+    if isinstance(obj, tuple):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def write_json(path, data: Any):
+    """Write data to path as indented JSON"""
+    if HAS_ORJSON:
+        Path(path).write_bytes(orjson.dumps(
+            data,
+            default=_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE
+        ))
+    else:
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)
+            f.write('\n')
+
+def read_json(path) -> Any:
+    """Read a JSON document from path"""
+    return loads(Path(path).read_bytes())
+
+def read_json_mapped(path) -> Any:
+    """Read a JSON document by memory-mapping path instead of copying it into a buffer"""
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        view = memoryview(mm)
+        try:
+            # orjson parses the mapping in place; json needs its own bytes copy
+            return loads(view if HAS_ORJSON else view.tobytes())
+        finally:
+            view.release()
+
+def dumps_line(data: Any) -> bytes:
+    """Serialize data as one compact, newline-terminated JSONL record"""
+    if HAS_ORJSON:
+        return orjson.dumps(data, default=_default,
+                            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, separators=(',', ':')) + '\n').encode()
@@ -0,0 +1,94 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Process-wide logging setup for the K(t) Framework.
+
+Records are queued by a QueueHandler on the root logger and written by a
+single QueueListener thread, so callers never block on console or file I/O.
+configure_logging is idempotent: the console handler is installed once and
+each distinct log file is added to the same listener.
+
+The queue is a multiprocessing queue, so worker processes can log through
+the parent's listener: pass configure_worker_logging as the pool initializer
+with log_queue() as its argument.
+"""
+
+import atexit
+import logging
+import logging.handlers
+import multiprocessing
+from pathlib import Path
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_log_queue = None
+_file_handlers: Dict[Path, logging.Handler] = {}
+
+def configure_logging(log_file, level: int = logging.INFO):
+    """Route root logging through the shared queue listener, adding log_file"""
+    global _listener, _log_queue
+
+    log_file = Path(log_file).absolute()
+    if log_file in _file_handlers:
+        return
+
+    log_file.parent.mkdir(parents=True, exist_ok=True)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    _file_handlers[log_file] = file_handler
+
+    if _listener is None:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        _log_queue = multiprocessing.Queue()
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(logging.handlers.QueueHandler(_log_queue))
+
+        _listener = logging.handlers.QueueListener(
+            _log_queue, console_handler, file_handler, respect_handler_level=True
+        )
+        _listener.start()
+        atexit.register(_stop_listener)
+    else:
+        # Records queued while the listener restarts are kept and written after
+        _listener.stop()
+        _listener.handlers = _listener.handlers + (file_handler,)
+        _listener.start()
+
+def log_queue():
+    """The queue worker processes log to, or None before configure_logging"""
+    return _log_queue
+
+def configure_worker_logging(log_queue, level: int = logging.INFO):
+    """
+    Pool initializer: send this worker's records to the parent's listener
+
+    Does nothing when log_queue is None (configure_logging never ran in the
+    parent), leaving the worker's logging as the process start left it.
+    """
+    global _listener
+
+    if log_queue is None:
+        return
+
+    # A forked worker inherits the parent's handlers but not its listener
+    # thread; drop them so nothing is written or queued from here directly
+    _listener = None
+    _file_handlers.clear()
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(level)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+
+def _stop_listener():
+    """Drain the queue and close all handlers at interpreter exit"""
+    if _listener is not None:
+        _listener.stop()
+    for handler in _file_handlers.values():
+        handler.close()
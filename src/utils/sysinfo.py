@@ -0,0 +1,48 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""System information readers shared by the K(t) monitors and test harnesses.
+
+Optional psutil APIs are resolved once for the platform rather than per
+sample; each is None where psutil doesn't provide it. CPU cache topology
+is read from sysfs once per process, since it doesn't change while the
+system is up.
+"""
+
+import functools
+import os
+import platform
+from typing import Dict
+
+import psutil
+
+CPU_FREQ = getattr(psutil, 'cpu_freq', None)
+LOADAVG = getattr(psutil, 'getloadavg', None)
+
+CPU_CACHE_PATH = '/sys/devices/system/cpu/cpu0/cache'
+
+def read_sysfs(path: str) -> str:
+    """Read a short sysfs attribute with a single open/read/close"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        return os.read(fd, 64).decode().strip()
+    finally:
+        os.close(fd)
+
+@functools.lru_cache(maxsize=1)
+def _read_cache_info() -> Dict[str, str]:
+    cache_info = {}
+    if platform.system() == 'Linux' and os.path.isdir(CPU_CACHE_PATH):
+        with os.scandir(CPU_CACHE_PATH) as entries:
+            for level in entries:
+                if not level.name.startswith('index'):
+                    continue
+                size = read_sysfs(level.path + '/size')
+                type = read_sysfs(level.path + '/type')
+                cache_info[f"L{level.name[-1]}_{type}"] = size
+    return cache_info
+
+def cache_info() -> Dict[str, str]:
+    """CPU cache sizes keyed by index and type (empty off Linux)"""
+    # Copied so callers can't alter the cached result
+    return dict(_read_cache_info())
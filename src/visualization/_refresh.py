@@ -0,0 +1,50 @@
+# Copyright (c) 2025 isekAI
+# SPDX-License-Identifier: Apache-2.0
+
+"""Adaptive chart refresh shared by the K(t) visualization windows.
+
+The update timer polls faster while CPU usage is volatile and backs off
+while it is steady. The interval is MAX_INTERVAL_MS when the recent CPU
+readings are flat, halves for every VOLATILITY_HALVING points of standard
+deviation, and never drops below MIN_INTERVAL_MS.
+"""
+
+from collections import deque
+
+import numpy as np
+
+# Update timer interval when not adapting, and the adaptive range
+UPDATE_INTERVAL_MS = 1000
+MIN_INTERVAL_MS = 250
+MAX_INTERVAL_MS = 5000
+
+# Standard deviation of CPU % that halves the adaptive interval
+VOLATILITY_HALVING = 2.5
+VOLATILITY_WINDOW = 10
+
+def adaptive_interval(volatility: float) -> int:
+    """Timer interval in ms for a CPU % standard deviation"""
+    interval = int(MAX_INTERVAL_MS / (1 + volatility / VOLATILITY_HALVING))
+    return max(interval, MIN_INTERVAL_MS)
+
+class AdaptiveRefresh:
+    """Retunes a QTimer's interval from the most recent CPU readings"""
+
+    def __init__(self, timer, window: int = VOLATILITY_WINDOW):
+        self.timer = timer
+        self.enabled = True
+        self._recent_cpu = deque(maxlen=window)
+
+    def record(self, cpu_percent: float):
+        """Add a CPU reading and, when enabled, adapt the timer to it"""
+        self._recent_cpu.append(cpu_percent)
+        if not self.enabled or len(self._recent_cpu) < 2:
+            return
+
+        self.timer.setInterval(adaptive_interval(float(np.std(self._recent_cpu))))
+
+    def set_enabled(self, enabled: bool):
+        """Turn adaptation on or off; off restores the fixed UPDATE_INTERVAL_MS"""
+        self.enabled = enabled
+        if not enabled:
+            self.timer.setInterval(UPDATE_INTERVAL_MS)
@@ -1,12 +1,50 @@
 # Copyright (c) 2025 isekAI
 # SPDX-License-Identifier: Apache-2.0
 
+import atexit
+import copy
+import csv
+import os
+import struct
+import time
 from pathlib import Path
 from datetime import datetime
-import json
 import uuid
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+import weakref
+from typing import Dict, List, Any, Tuple, Iterator, Optional
+import numpy as np
+
+from utils.jsonio import dumps_line, loads, read_json, write_json
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Fixed-size binary ring of numeric metrics: a header page followed by records.
+# Each record carries its 1-based sequence number, so readers find the oldest
+# record without a count in the header; slots never written read back as 0.
+RING_BYTES = 64 * 1024 * 1024
+RING_HEADER_BYTES = 4096
+RING_MAGIC = b"KTRB"
+RING_VERSION = 2
+RING_FIELDS = ("timestamp", "cpu_percent", "memory_percent", "efficiency", "active_cores")
+_RING_HEADER = struct.Struct("<4sHHI")    # magic, version, record size, capacity
+_RING_RECORD = struct.Struct("<Qdffff")   # sequence number, then one value per RING_FIELDS entry
+_RING_DTYPE = np.dtype([("seq", "<u8"), ("timestamp", "<f8")]
+                       + [(field, "<f4") for field in RING_FIELDS[1:]])
+RING_CAPACITY = (RING_BYTES - RING_HEADER_BYTES) // _RING_RECORD.size
+
+# Positional writes are POSIX-only; elsewhere the ring is simply not kept
+_HAS_PWRITE = hasattr(os, "pwrite")
+
+# Handlers still open, closed together at interpreter exit without being kept alive
+_open_handlers = weakref.WeakSet()
+
+@atexit.register
+def _close_open_handlers():
+    for handler in list(_open_handlers):
+        handler.close()
 
 class KTDataHandler:
     """Handles data persistence and export for K(t) Framework visualization"""
@@ -28,6 +66,17 @@ class KTDataHandler:
             "metrics": [],
             "patterns": []
         }
+        
+        # Metrics not yet appended to the raw metrics log
+        self._unflushed: List[dict] = []
+        
+        # Binary metrics ring, opened on the first metrics sample
+        self._ring_fd: Optional[int] = None
+        self._ring_written = 0
+        _open_handlers.add(self)
+        
+        # (fingerprint, result) of the last get_baseline_patterns call
+        self._baseline_cache: Tuple[Any, dict] = (None, {})
 
     def add_system_info(self, system_info: dict):
         """Store system information for the current session"""
@@ -40,17 +89,34 @@ class KTDataHandler:
         )
 
     def add_metrics(self, metrics: dict):
-        """Add metrics data point to current session"""
-        metrics["timestamp"] = datetime.now().isoformat()
+        """
+        Add metrics data point to current session
+        
+        Every sample goes to the JSONL log. Samples with any numeric
+        RING_FIELDS at their top level (cpu_percent, memory_percent, ...)
+        are also written to the binary ring; nested records such as
+        scenario summaries have none and are left out of it.
+        """
+        metrics["timestamp"] = time.time()
         self.current_session["metrics"].append(metrics)
+        self._unflushed.append(metrics)
+        self._append_ring_record(metrics)
         
         # Periodic save of raw metrics (every 60 samples)
-        if len(self.current_session["metrics"]) % 60 == 0:
+        if len(self._unflushed) >= 60:
             self._save_raw_metrics()
 
+    def close(self):
+        """Flush pending raw metrics and close the metrics ring"""
+        self._save_raw_metrics()
+        if self._ring_fd is not None:
+            self._ring_finalizer()
+            self._ring_fd = None
+        _open_handlers.discard(self)
+
     def add_pattern(self, pattern: dict):
         """Add detected pattern to current session"""
-        pattern["timestamp"] = datetime.now().isoformat()
+        pattern["timestamp"] = time.time()
         self.current_session["patterns"].append(pattern)
         
         # Save pattern immediately
@@ -69,37 +135,84 @@ class KTDataHandler:
         elif format == "csv":
             # Export metrics as CSV
             metrics_file = self.processed_path / f"metrics_{session_id}_{timestamp}.csv"
-            df = pd.DataFrame(self.current_session["metrics"])
-            df.to_csv(metrics_file, index=False)
+            self._write_csv(metrics_file, self.current_session["metrics"])
             
             # Export patterns as CSV
             patterns_file = self.processed_path / f"patterns_{session_id}_{timestamp}.csv"
-            df = pd.DataFrame(self.current_session["patterns"])
-            df.to_csv(patterns_file, index=False)
+            self._write_csv(patterns_file, self.current_session["patterns"])
             
             return str(metrics_file), str(patterns_file)
         
+        elif format == "msgpack":
+            if msgpack is None:
+                raise ImportError("msgpack is required for MessagePack export")
+            filepath = self.processed_path / f"session_{session_id}_{timestamp}.msgpack"
+            filepath.write_bytes(msgpack.packb(self.current_session, use_bin_type=True))
+            return str(filepath)
+        
         else:
             raise ValueError(f"Unsupported export format: {format}")
 
     def load_session(self, session_id: str) -> dict:
         """Load a previous session by ID"""
-        # Look for session file in processed directory
-        session_files = list(self.processed_path.glob(f"session_{session_id}_*.json"))
+        # Look for JSON or MessagePack session files in processed directory
+        session_files = [
+            *self.processed_path.glob(f"session_{session_id}_*.json"),
+            *self.processed_path.glob(f"session_{session_id}_*.msgpack")
+        ]
         
         if not session_files:
             raise FileNotFoundError(f"No session found with ID: {session_id}")
             
         # Load the most recent file if multiple exist
         latest_file = max(session_files, key=lambda x: x.stat().st_mtime)
+        if latest_file.suffix == ".msgpack":
+            if msgpack is None:
+                raise ImportError("msgpack is required to load MessagePack sessions")
+            return msgpack.unpackb(latest_file.read_bytes(), raw=False)
         return self._load_json(latest_file)
 
+    def load_patterns(self, session_id: str) -> List[dict]:
+        """Load the patterns recorded for a session"""
+        return list(self._iter_patterns(session_id))
+
+    def load_metrics_ring(self, session_id: str) -> List[dict]:
+        """Load a session's binary metrics ring, oldest record first"""
+        ring_file = self.raw_path / f"metrics_{session_id}.bin"
+        
+        with open(ring_file, 'rb') as f:
+            magic, version, record_size, capacity = _RING_HEADER.unpack(
+                f.read(_RING_HEADER.size)
+            )
+            if magic != RING_MAGIC or version != RING_VERSION or record_size != _RING_RECORD.size:
+                raise ValueError(f"Unsupported metrics ring file: {ring_file}")
+            
+            f.seek(RING_HEADER_BYTES)
+            records = np.fromfile(f, dtype=_RING_DTYPE, count=capacity)
+        
+        # Written slots have nonzero sequence numbers; order by them, oldest first
+        records = records[records["seq"] > 0]
+        records = records[np.argsort(records["seq"])]
+        
+        return [dict(zip(RING_FIELDS, values)) for values in records[list(RING_FIELDS)].tolist()]
+
     def get_baseline_patterns(self) -> dict:
         """Load and analyze baseline patterns from historical data"""
         pattern_files = list(self.raw_path.glob("pattern_analysis_*.json"))
         
         if not pattern_files:
             return {}
+        
+        # Results only change when the pattern files do, so reuse the last
+        # analysis while names, sizes and modification times all match.
+        # Callers get their own copy, so changes to it never reach the cache.
+        fingerprint = frozenset(
+            (file.name, stat.st_mtime_ns, stat.st_size)
+            for file, stat in ((file, file.stat()) for file in pattern_files)
+        )
+        cached_fingerprint, cached_baselines = self._baseline_cache
+        if fingerprint == cached_fingerprint:
+            return copy.deepcopy(cached_baselines)
             
         baselines = {
             "idle": [],
@@ -117,50 +230,116 @@ class KTDataHandler:
                 baselines["gaming"].append(data)
         
         # Calculate average patterns
-        return {
+        averaged = {
             category: self._average_patterns(patterns)
             for category, patterns in baselines.items()
             if patterns
         }
+        self._baseline_cache = (fingerprint, averaged)
+        return copy.deepcopy(averaged)
 
     def _save_raw_metrics(self):
-        """Save current batch of raw metrics"""
-        metrics_file = self.raw_path / f"metrics_{self.current_session['session_id']}.json"
-        self._save_json(metrics_file, self.current_session["metrics"])
+        """Append metrics gathered since the last save to the session's JSONL log"""
+        if not self._unflushed:
+            return
+            
+        metrics_file = self.raw_path / f"metrics_{self.current_session['session_id']}.jsonl"
+        with open(metrics_file, 'ab') as f:
+            f.write(b"".join(dumps_line(m) for m in self._unflushed))
+        self._unflushed.clear()
+
+    def _open_ring(self):
+        """Create this session's metrics ring file at its full size"""
+        ring_file = self.raw_path / f"metrics_{self.current_session['session_id']}.bin"
+        self._ring_fd = os.open(ring_file, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        
+        # The descriptor is released even if the handler is dropped without close()
+        self._ring_finalizer = weakref.finalize(self, os.close, self._ring_fd)
+        
+        # Truncating zero-fills the file, so every slot starts with sequence number 0
+        os.ftruncate(self._ring_fd, RING_BYTES)
+        os.pwrite(self._ring_fd,
+                  _RING_HEADER.pack(RING_MAGIC, RING_VERSION, _RING_RECORD.size, RING_CAPACITY),
+                  0)
+
+    def _append_ring_record(self, metrics: dict):
+        """Write one metrics record into the ring at a fixed offset, in a single pwrite"""
+        if not _HAS_PWRITE:
+            return
+        
+        values = [metrics.get(field) for field in RING_FIELDS]
+
+        # add_metrics always sets the timestamp; without any other field there's nothing to keep
+        if not any(isinstance(v, (int, float)) for v in values[1:]):
+            return
+        if self._ring_fd is None:
+            self._open_ring()
+
+        slot = self._ring_written % RING_CAPACITY
+        self._ring_written += 1
+        record = _RING_RECORD.pack(self._ring_written,
+                                   *(v if isinstance(v, (int, float)) else float("nan")
+                                     for v in values))
+        os.pwrite(self._ring_fd, record,
+                  RING_HEADER_BYTES + slot * _RING_RECORD.size)
 
     def _save_pattern(self, pattern: dict):
-        """Save individual pattern data"""
-        pattern_file = self.raw_path / f"pattern_{self.current_session['session_id']}.json"
+        """Append individual pattern data to the session's JSONL log"""
+        pattern_file = self.raw_path / f"pattern_{self.current_session['session_id']}.jsonl"
+        
+        with open(pattern_file, 'ab') as f:
+            f.write(dumps_line(pattern))
+
+    def _iter_patterns(self, session_id: str) -> Iterator[dict]:
+        """Yield a session's patterns from its JSONL log or a legacy JSON array"""
+        pattern_file = self.raw_path / f"pattern_{session_id}.jsonl"
+        legacy_file = self.raw_path / f"pattern_{session_id}.json"
         
-        # Load existing patterns if file exists
-        existing_patterns = []
         if pattern_file.exists():
-            existing_patterns = self._load_json(pattern_file)
-            
-        # Append new pattern and save
-        existing_patterns.append(pattern)
-        self._save_json(pattern_file, existing_patterns)
+            with open(pattern_file, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield loads(line)
+        elif legacy_file.exists():
+            yield from self._load_json(legacy_file)
 
     def _average_patterns(self, patterns: List[dict]) -> dict:
         """Calculate average pattern metrics"""
         if not patterns:
             return {}
             
-        avg_pattern = {}
-        for key in patterns[0].keys():
-            if isinstance(patterns[0][key], (int, float)):
-                avg_pattern[key] = sum(p[key] for p in patterns) / len(patterns)
-            else:
-                avg_pattern[key] = patterns[0][key]
+        # Numeric columns are averaged in one pass; others come from the first pattern
+        avg_pattern = dict(patterns[0])
+        numeric = [key for key, value in avg_pattern.items() if isinstance(value, (int, float))]
+        if numeric:
+            table = np.array([[p[key] for key in numeric] for p in patterns], dtype=np.float64)
+            avg_pattern.update(zip(numeric, table.mean(axis=0).tolist()))
                 
         return avg_pattern
 
+    def _write_csv(self, filepath: Path, rows: List[dict]):
+        """Stream rows to CSV, with columns in first-seen key order"""
+        fieldnames = list(dict.fromkeys(key for row in rows for key in row))
+        
+        with open(filepath, 'w', newline='', buffering=1 << 20) as f:
+            if not fieldnames:
+                return
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(self._readable_rows(rows))
+
+    def _readable_rows(self, rows: List[dict]) -> Iterator[dict]:
+        """Yield rows with epoch timestamps converted to ISO strings for export"""
+        for row in rows:
+            ts = row.get("timestamp")
+            if isinstance(ts, float):
+                row = {**row, "timestamp": datetime.fromtimestamp(ts).isoformat()}
+            yield row
+
     def _save_json(self, filepath: Path, data: Any):
         """Save data to JSON file"""
-        with open(filepath, 'w') as f:
-            json.dump(data, f, indent=2)
+        write_json(filepath, data)
 
     def _load_json(self, filepath: Path) -> Any:
         """Load data from JSON file"""
-        with open(filepath, 'r') as f:
-            return json.load(f)
\ No newline at end of file
+        return read_json(filepath)
\ No newline at end of file
@@ -1,13 +1,48 @@
 import sys
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
-                             QHBoxLayout, QTabWidget, QPushButton, QLabel)
-from PySide6.QtCore import Qt, QTimer, Slot
+                             QHBoxLayout, QTabWidget, QPushButton, QLabel, QCheckBox)
+from PySide6.QtCore import (Qt, QTimer, Slot, QPointF, QObject, QRunnable,
+                            QThreadPool, Signal)
 from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 import json
+import time
 import numpy as np
+from collections import deque
 from datetime import datetime
 from ..core.kt_optimizer import KTParameters
 from ..monitoring.kt_integrated_monitor import KtSystemMonitor
+from ..utils.jsonio import read_json_mapped
+from ._refresh import AdaptiveRefresh, UPDATE_INTERVAL_MS
+
+# Baseline pattern analyses compared against live data
+HISTORICAL_DATA = {
+    'idle': 'data/raw/pattern_analysis_idle.json',
+    'load': 'data/raw/pattern_analysis_med_gaming.json'
+}
+
+# Smallest change in (CPU %, memory %, efficiency) worth redrawing for
+CHANGE_THRESHOLDS = (0.1, 0.1, 0.001)
+
+class _HistoryLoaderSignals(QObject):
+    """Delivers historical data from the loader thread to the UI thread"""
+    loaded = Signal(dict)
+    failed = Signal(str)
+
+class _HistoryLoader(QRunnable):
+    """Reads the baseline pattern analyses off the UI thread"""
+    
+    def __init__(self, signals: _HistoryLoaderSignals):
+        super().__init__()
+        self.signals = signals
+    
+    def run(self):
+        try:
+            patterns = {name: read_json_mapped(path)['patterns']
+                        for name, path in HISTORICAL_DATA.items()}
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+        else:
+            self.signals.loaded.emit(patterns)
 
 class KTVisualizationWindow(QMainWindow):
     def __init__(self):
@@ -19,20 +54,30 @@ class KTVisualizationWindow(QMainWindow):
         self.kt_params = KTParameters()
         self.monitor = KtSystemMonitor()
         
-        # Setup UI
-        self.setup_ui()
-        
-        # Setup data structures
+        # Setup data structures (before the UI, which adds them to the charts)
         self.cpu_series = QLineSeries()
         self.memory_series = QLineSeries()
         self.efficiency_series = QLineSeries()
         
+        # Setup UI
+        self.setup_ui()
+        
+        # Sliding windows of chart points, pushed to the series with replace()
+        self.max_data_points = 100
+        self._cpu_pts = deque(maxlen=self.max_data_points)
+        self._memory_pts = deque(maxlen=self.max_data_points)
+        self._efficiency_pts = deque(maxlen=self.max_data_points)
+        self._last_values = (float('nan'),) * len(CHANGE_THRESHOLDS)
+        
         # Setup update timer
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_metrics)
-        self.update_timer.start(1000)  # Update every second
+        self.update_timer.start(UPDATE_INTERVAL_MS)  # Update every second until adapted
+        self.refresh = AdaptiveRefresh(self.update_timer)
+        self.adaptive_checkbox.toggled.connect(self.refresh.set_enabled)
         
-        # Load historical data
+        # Load historical data in the background; empty until it arrives
+        self.baseline_patterns = {}
         self.load_historical_data()
 
     def setup_ui(self):
@@ -50,18 +95,20 @@ class KTVisualizationWindow(QMainWindow):
         realtime_layout = QHBoxLayout(realtime_tab)
         
         # CPU Chart
-        cpu_chart = QChart()
-        cpu_chart.setTitle("CPU Utilization")
-        cpu_view = QChartView(cpu_chart)
-        cpu_view.setMinimumSize(400, 300)
-        realtime_layout.addWidget(cpu_view)
+        self.cpu_chart = QChart()
+        self.cpu_chart.setTitle("CPU Utilization")
+        self.cpu_axis_x = self.attach_series(self.cpu_chart, self.cpu_series, "Usage %", 100)
+        self.cpu_view = QChartView(self.cpu_chart)
+        self.cpu_view.setMinimumSize(400, 300)
+        realtime_layout.addWidget(self.cpu_view)
         
         # Memory Chart
-        memory_chart = QChart()
-        memory_chart.setTitle("Memory Usage")
-        memory_view = QChartView(memory_chart)
-        memory_view.setMinimumSize(400, 300)
-        realtime_layout.addWidget(memory_view)
+        self.memory_chart = QChart()
+        self.memory_chart.setTitle("Memory Usage")
+        self.memory_axis_x = self.attach_series(self.memory_chart, self.memory_series, "Usage %", 100)
+        self.memory_view = QChartView(self.memory_chart)
+        self.memory_view.setMinimumSize(400, 300)
+        realtime_layout.addWidget(self.memory_view)
         
         tabs.addTab(realtime_tab, "Real-time Monitoring")
         
@@ -70,10 +117,12 @@ class KTVisualizationWindow(QMainWindow):
         pattern_layout = QVBoxLayout(pattern_tab)
         
         # Efficiency Chart
-        efficiency_chart = QChart()
-        efficiency_chart.setTitle("K(t) Framework Efficiency")
-        efficiency_view = QChartView(efficiency_chart)
-        pattern_layout.addWidget(efficiency_view)
+        self.efficiency_chart = QChart()
+        self.efficiency_chart.setTitle("K(t) Framework Efficiency")
+        self.efficiency_axis_x = self.attach_series(self.efficiency_chart, self.efficiency_series,
+                                                    "Efficiency", 1)
+        self.efficiency_view = QChartView(self.efficiency_chart)
+        pattern_layout.addWidget(self.efficiency_view)
         
         tabs.addTab(pattern_tab, "Pattern Analysis")
         
@@ -94,36 +143,84 @@ class KTVisualizationWindow(QMainWindow):
         export_button.clicked.connect(self.export_data)
         control_layout.addWidget(export_button)
         
+        self.adaptive_checkbox = QCheckBox("Adaptive Refresh")
+        self.adaptive_checkbox.setChecked(True)
+        control_layout.addWidget(self.adaptive_checkbox)
+        
         layout.addWidget(control_panel)
         
         # Status bar
         self.statusBar().showMessage("K(t) Framework Monitor Ready")
 
+    def attach_series(self, chart, series, y_title, y_max):
+        """Add series to chart with a scrolling time axis; returns the time axis"""
+        chart.addSeries(series)
+        
+        axis_x = QValueAxis()
+        axis_x.setTitleText("Time (s)")
+        axis_x.setLabelFormat("%.0f")
+        
+        axis_y = QValueAxis()
+        axis_y.setTitleText(y_title)
+        axis_y.setRange(0, y_max)
+        
+        chart.addAxis(axis_x, Qt.AlignBottom)
+        chart.addAxis(axis_y, Qt.AlignLeft)
+        series.attachAxis(axis_x)
+        series.attachAxis(axis_y)
+        
+        return axis_x
+
     def load_historical_data(self):
-        try:
-            with open('data/raw/pattern_analysis_idle.json', 'r') as f:
-                idle_data = json.load(f)
-            with open('data/raw/pattern_analysis_med_gaming.json', 'r') as f:
-                load_data = json.load(f)
-                
-            # Process historical data for baseline comparison
-            self.baseline_patterns = {
-                'idle': idle_data['patterns'],
-                'load': load_data['patterns']
-            }
-            
-        except Exception as e:
-            self.statusBar().showMessage(f"Warning: Could not load historical data - {str(e)}")
+        signals = _HistoryLoaderSignals(self)
+        signals.loaded.connect(self.on_historical_data_loaded)
+        signals.failed.connect(self.on_historical_data_failed)
+        QThreadPool.globalInstance().start(_HistoryLoader(signals))
+
+    @Slot(dict)
+    def on_historical_data_loaded(self, patterns):
+        # Process historical data for baseline comparison
+        self.baseline_patterns = patterns
+
+    @Slot(str)
+    def on_historical_data_failed(self, error):
+        self.statusBar().showMessage(f"Warning: Could not load historical data - {error}")
 
     @Slot()
     def update_metrics(self):
         # Get current metrics from monitor
         metrics = self.monitor.get_system_metrics()
+        now = time.time()
+        self.refresh.record(metrics['cpu']['overall_percent'])
+        
+        # Skip all chart and status work while the metrics hold steady
+        values = (metrics['cpu']['overall_percent'],
+                  metrics['memory']['percent_used'],
+                  metrics['patterns']['cpu_distribution']['distribution_score'])
+        if all(abs(new - old) < threshold for new, old, threshold
+               in zip(values, self._last_values, CHANGE_THRESHOLDS)):
+            return
+        self._last_values = values
         
-        # Update charts
-        self.update_cpu_chart(metrics['cpu'])
-        self.update_memory_chart(metrics['memory'])
-        self.update_efficiency_chart(metrics['patterns'])
+        # Update charts, all stamped with the same tick time, with painting
+        # suspended so the three updates land in a single repaint
+        chart_views = (self.cpu_view, self.memory_view, self.efficiency_view)
+        for view in chart_views:
+            view.setUpdatesEnabled(False)
+        try:
+            self.update_cpu_chart(metrics['cpu'], now)
+            self.update_memory_chart(metrics['memory'], now)
+            self.update_efficiency_chart(metrics['patterns'], now)
+            
+            # Fit every time axis to the points held; their time span depends on
+            # the adaptive refresh interval, not just on max_data_points
+            oldest = self._cpu_pts[0].x()
+            if now > oldest:
+                for axis_x in (self.cpu_axis_x, self.memory_axis_x, self.efficiency_axis_x):
+                    axis_x.setRange(oldest, now)
+        finally:
+            for view in chart_views:
+                view.setUpdatesEnabled(True)
         
         # Update status
         status_msg = (f"CPU: {metrics['cpu']['overall_percent']:.1f}% | "
@@ -131,28 +228,19 @@ class KTVisualizationWindow(QMainWindow):
                      f"Efficiency: {metrics['patterns']['cpu_distribution']['distribution_score']:.3f}")
         self.statusBar().showMessage(status_msg)
 
-    def update_cpu_chart(self, cpu_metrics):
-        timestamp = datetime.now().timestamp()
-        self.cpu_series.append(timestamp, cpu_metrics['overall_percent'])
-        
-        # Remove old data points to prevent memory buildup
-        if self.cpu_series.count() > 100:
-            self.cpu_series.remove(0)
+    def update_cpu_chart(self, cpu_metrics, now):
+        # The bounded deque drops old points, so the series never grows past the window
+        self._cpu_pts.append(QPointF(now, cpu_metrics['overall_percent']))
+        self.cpu_series.replace(list(self._cpu_pts))
 
-    def update_memory_chart(self, memory_metrics):
-        timestamp = datetime.now().timestamp()
-        self.memory_series.append(timestamp, memory_metrics['percent_used'])
-        
-        if self.memory_series.count() > 100:
-            self.memory_series.remove(0)
+    def update_memory_chart(self, memory_metrics, now):
+        self._memory_pts.append(QPointF(now, memory_metrics['percent_used']))
+        self.memory_series.replace(list(self._memory_pts))
 
-    def update_efficiency_chart(self, pattern_metrics):
-        timestamp = datetime.now().timestamp()
+    def update_efficiency_chart(self, pattern_metrics, now):
         efficiency = pattern_metrics['cpu_distribution']['distribution_score']
-        self.efficiency_series.append(timestamp, efficiency)
-        
-        if self.efficiency_series.count() > 100:
-            self.efficiency_series.remove(0)
+        self._efficiency_pts.append(QPointF(now, efficiency))
+        self.efficiency_series.replace(list(self._efficiency_pts))
 
     @Slot()
     def start_monitoring(self):
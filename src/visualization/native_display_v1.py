@@ -1,12 +1,19 @@
 import sys
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
-                             QTabWidget, QPushButton, QLabel)
-from PySide6.QtCore import Qt, QTimer, Slot
+                             QTabWidget, QPushButton, QLabel, QCheckBox)
+from PySide6.QtCore import Qt, QTimer, Slot, QPointF
 from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 import psutil
+import time
+import numpy as np
 from datetime import datetime
 import json
 
+from visualization._refresh import AdaptiveRefresh, UPDATE_INTERVAL_MS
+
+# Smallest change in (CPU %, memory %) worth redrawing for
+CHANGE_THRESHOLDS = (0.1, 0.1)
+
 class KTVisualizationWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -14,9 +21,14 @@ class KTVisualizationWindow(QMainWindow):
         self.resize(1000, 600)
         
         # Initialize data storage
-        self.cpu_data = []
-        self.memory_data = []
-        self.max_data_points = 60  # Store 1 minute of data
+        self.max_data_points = 60  # Store the last 60 samples
+        
+        # Ring buffer of (time, cpu, memory) rows; head is the next row to write
+        self._data = np.empty((self.max_data_points, 3), dtype=np.float64)
+        self._head = 0
+        self._count = 0
+        self._last_values = (float('nan'),) * len(CHANGE_THRESHOLDS)
+        self.start_time = time.monotonic()  # x values are seconds since this point
         
         # Setup UI
         self.setup_ui()
@@ -27,7 +39,9 @@ class KTVisualizationWindow(QMainWindow):
         # Setup update timer
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self.update_metrics)
-        self.update_timer.start(1000)  # Update every second
+        self.update_timer.start(UPDATE_INTERVAL_MS)  # Update every second until adapted
+        self.refresh = AdaptiveRefresh(self.update_timer)
+        self.adaptive_checkbox.toggled.connect(self.refresh.set_enabled)
 
     def setup_ui(self):
         # Create central widget and layout
@@ -61,6 +75,10 @@ class KTVisualizationWindow(QMainWindow):
         stop_button.clicked.connect(self.stop_monitoring)
         control_layout.addWidget(stop_button)
         
+        self.adaptive_checkbox = QCheckBox("Adaptive Refresh")
+        self.adaptive_checkbox.setChecked(True)
+        control_layout.addWidget(self.adaptive_checkbox)
+        
         layout.addLayout(control_layout)
 
     def setup_charts(self):
@@ -106,25 +124,36 @@ class KTVisualizationWindow(QMainWindow):
         cpu_percent = psutil.cpu_percent()
         memory = psutil.virtual_memory()
         memory_percent = memory.percent
-        
-        # Update data storage
-        current_time = len(self.cpu_data)
-        self.cpu_data.append((current_time, cpu_percent))
-        self.memory_data.append((current_time, memory_percent))
-        
-        # Maintain fixed window of data
-        if len(self.cpu_data) > self.max_data_points:
-            self.cpu_data.pop(0)
-            self.memory_data.pop(0)
-        
-        # Update series
-        self.cpu_series.clear()
-        self.memory_series.clear()
-        
-        for time, value in self.cpu_data:
-            self.cpu_series.append(time, value)
-        for time, value in self.memory_data:
-            self.memory_series.append(time, value)
+        current_time = time.monotonic() - self.start_time
+        self.refresh.record(cpu_percent)
+        
+        # Skip all chart and status work while the metrics hold steady
+        values = (cpu_percent, memory_percent)
+        if all(abs(new - old) < threshold for new, old, threshold
+               in zip(values, self._last_values, CHANGE_THRESHOLDS)):
+            return
+        self._last_values = values
+        
+        # Update data storage, overwriting the oldest row once full
+        self._data[self._head] = (current_time, cpu_percent, memory_percent)
+        self._head = (self._head + 1) % self.max_data_points
+        self._count = min(self._count + 1, self.max_data_points)
+        
+        # Update series, one replace() per series, oldest point first
+        if self._count < self.max_data_points:
+            window = self._data[:self._count]
+        else:
+            window = np.concatenate((self._data[self._head:], self._data[:self._head]))
+        
+        # Fit the time axis to the samples held; their time span depends on
+        # the adaptive refresh interval, not just on max_data_points
+        oldest = window[0, 0]
+        if current_time > oldest:
+            self.axis_x.setRange(oldest, current_time)
+        
+        rows = window.tolist()
+        self.cpu_series.replace([QPointF(t, cpu) for t, cpu, _ in rows])
+        self.memory_series.replace([QPointF(t, mem) for t, _, mem in rows])
         
         # Update status
         status_msg = f"CPU: {cpu_percent:.1f}% | Memory: {memory_percent:.1f}%"
@@ -8,20 +8,36 @@ import json
 import math
 import psutil
 import uuid
-from typing import Dict, List, Any, Tuple
-import pandas as pd
+from typing import Dict, List, Any, Tuple, Optional
+import numpy as np
 
 try:
     from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                                 QTabWidget, QPushButton, QLabel, QHBoxLayout, QMenuBar,
                                 QMenu, QFileDialog, QMessageBox)
-    from PySide6.QtCore import Qt, QTimer, Slot
+    from PySide6.QtCore import Qt, QTimer, Slot, QPointF, QEvent
+    from PySide6.QtGui import QPainter
     from PySide6.QtCharts import QChart, QChartView, QLineSeries, QValueAxis
 except ImportError:
     print("Error: PySide6 packages not found. Please ensure PySide6 is installed.")
     sys.exit(1)
 
 from data_handler import KTDataHandler
+from utils.downsample import lttb
+from utils.jit import njit
+
+def _make_efficiency_kernel(thread_count: int):
+    """Compile the per-tick efficiency calculation with thread_count as a constant"""
+    @njit
+    def efficiency_kernel(cpu_percent, active_cores):
+        base_load = cpu_percent / 100.0
+        complexity_factor = 1 + math.sqrt(active_cores) * 0.025
+        distribution_factor = 1 - abs(0.5 - active_cores / thread_count)
+        efficiency = base_load * complexity_factor * distribution_factor
+        dampening = max(0.1, 1 / (1 + math.exp((efficiency - 0.8) / 4)))
+        return max(0.001, efficiency * dampening)
+    
+    return efficiency_kernel
 
 class KTVisualizationWindow(QMainWindow):
     def __init__(self):
@@ -32,11 +48,14 @@ class KTVisualizationWindow(QMainWindow):
         # Initialize data handler
         self.data_handler = KTDataHandler()
         
-        # Initialize data storage
-        self.cpu_data = []
-        self.memory_data = []
-        self.efficiency_data = []
+        # Initialize data storage: one float32 ring per metric sharing a head index;
+        # full rings overwrite their oldest point
         self.max_data_points = 60
+        self._cpu = np.empty(self.max_data_points, dtype=np.float32)
+        self._memory = np.empty(self.max_data_points, dtype=np.float32)
+        self._efficiency = np.empty(self.max_data_points, dtype=np.float32)
+        self._head = 0
+        self._count = 0
         
         # Discover system capabilities
         self.system_info = self.discover_system()
@@ -53,9 +72,13 @@ class KTVisualizationWindow(QMainWindow):
         self.setup_performance_chart()
         self.setup_efficiency_chart()
         
+        # Charts not on screen aren't redrawn; catch them up when their tab is shown
+        self.tabs.currentChanged.connect(self.update_charts)
+        
         # Setup update timer
         self.update_timer = QTimer()
-        self.update_timer.timeout.connect(self.update_metrics)
+        self.update_timer.setTimerType(Qt.PreciseTimer)
+        self.update_timer.timeout.connect(self._tick)
         self.update_timer.start(1000)
 
     def setup_menu(self):
@@ -120,33 +143,84 @@ class KTVisualizationWindow(QMainWindow):
                 QMessageBox.warning(self, "Load Failed", str(e))
 
     def load_session_data(self, session_data: Dict):
-        # Clear current data
-        self.cpu_data.clear()
-        self.memory_data.clear()
-        self.efficiency_data.clear()
-        
-        # Load metrics
-        for metric in session_data["metrics"]:
-            self.cpu_data.append((len(self.cpu_data), metric["cpu_percent"]))
-            self.memory_data.append((len(self.memory_data), metric["memory_percent"]))
-            self.efficiency_data.append((len(self.efficiency_data), metric["efficiency"]))
+        # Only the session's most recent points fit in the window, so only those
+        # rows are read; columns go straight into the rings
+        metrics = session_data["metrics"][-self.max_data_points:]
+        n = len(metrics)
+        self._cpu[:n] = np.fromiter((m["cpu_percent"] for m in metrics), dtype=np.float32, count=n)
+        self._memory[:n] = np.fromiter((m["memory_percent"] for m in metrics),
+                                       dtype=np.float32, count=n)
+        cores = np.fromiter((m["active_cores"] for m in metrics), dtype=np.float32, count=n)
+        
+        # Recompute efficiency for the window at once, using the thread count of
+        # the system the session was recorded on
+        self._efficiency[:n] = self.calculate_efficiency_batch(
+            self._cpu[:n], cores, session_data.get("system_info", {}).get("thread_count"))
+        self._head = n % self.max_data_points
+        self._count = n
             
         # Update charts
         self.update_charts()
 
     def update_charts(self):
-        # Update performance series
-        self.cpu_series.clear()
-        self.memory_series.clear()
-        for time, value in self.cpu_data:
-            self.cpu_series.append(time, value)
-        for time, value in self.memory_data:
-            self.memory_series.append(time, value)
-        
-        # Update efficiency series
-        self.efficiency_series.clear()
-        for time, value in self.efficiency_data:
-            self.efficiency_series.append(time, value)
+        # Only the chart on screen is redrawn; the rings hold everything, so a
+        # hidden chart is simply redrawn from them when it is shown again
+        if self.isMinimized() or not self.isVisible():
+            return
+        
+        current_tab = self.tabs.currentWidget()
+        if current_tab is self.perf_tab:
+            view = self.perf_chart_view
+            updates = ((self.cpu_series, self._cpu), (self.memory_series, self._memory))
+        elif current_tab is self.kt_tab:
+            view = self.kt_chart_view
+            updates = ((self.efficiency_series, self._efficiency),)
+        else:
+            return
+        
+        # Replace each series in one call, with painting suspended so the
+        # changes land in a single repaint
+        view.setUpdatesEnabled(False)
+        try:
+            for series, ring in updates:
+                series.replace(self._points(ring, view))
+        finally:
+            view.setUpdatesEnabled(True)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_charts()
+
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        # Catch up after being restored from minimized
+        if event.type() == QEvent.WindowStateChange and not self.isMinimized():
+            self.update_charts()
+
+    def _window(self, ring: np.ndarray) -> np.ndarray:
+        """Samples in ring from oldest to newest"""
+        if self._count < self.max_data_points:
+            return ring[:self._count]
+        return np.concatenate((ring[self._head:], ring[:self._head]))
+
+    def _points(self, ring: np.ndarray, view: QChartView) -> List[QPointF]:
+        """Chart points for ring, with x as the position in the window"""
+        values = self._window(ring)
+        positions = np.arange(len(values), dtype=np.float32)
+        
+        # More than two points per pixel can't be told apart; keep the shape with LTTB
+        max_points = 2 * view.width()
+        if len(values) > max_points:
+            positions, values = lttb(positions, values, max_points)
+        return [QPointF(x, v) for x, v in zip(positions.tolist(), values.tolist())]
+
+    def _append_sample(self, cpu_percent: float, memory_percent: float, efficiency: float):
+        """Write one sample at the head of the rings"""
+        self._cpu[self._head] = cpu_percent
+        self._memory[self._head] = memory_percent
+        self._efficiency[self._head] = efficiency
+        self._head = (self._head + 1) % self.max_data_points
+        self._count = min(self._count + 1, self.max_data_points)
 
     @Slot()
     def view_baselines(self):
@@ -164,64 +238,74 @@ class KTVisualizationWindow(QMainWindow):
         QMessageBox.information(self, "Baseline Patterns", message)
 
     def calculate_efficiency(self, cpu_percent: float, active_cores: int) -> float:
-        # Enhanced K(t) framework efficiency calculation
+        return self._efficiency_kernel(cpu_percent, active_cores)
+
+    def calculate_efficiency_batch(self, cpu_percent: np.ndarray, active_cores: np.ndarray,
+                                   thread_count: Optional[int] = None) -> np.ndarray:
+        # Enhanced K(t) framework efficiency calculation, elementwise over arrays
+        thread_count = thread_count or self.system_info['thread_count']
         base_load = cpu_percent / 100.0
-        complexity_factor = 1 + math.sqrt(active_cores) * 0.025
+        complexity_factor = 1 + np.sqrt(active_cores) * 0.025
         
         # Calculate core distribution factor
-        core_ratio = active_cores / self.system_info['thread_count']
-        distribution_factor = 1 - abs(0.5 - core_ratio)  # Optimal at 50% core usage
+        core_ratio = active_cores / thread_count
+        distribution_factor = 1 - np.abs(0.5 - core_ratio)  # Optimal at 50% core usage
         
         efficiency = base_load * complexity_factor * distribution_factor
         
         # Apply soft dampening
-        dampening = max(0.1, 1 / (1 + math.exp((efficiency - 0.8) / 4)))
-        return max(0.001, efficiency * dampening)
+        dampening = np.maximum(0.1, 1 / (1 + np.exp((efficiency - 0.8) / 4)))
+        return np.maximum(0.001, efficiency * dampening)
 
     @Slot()
-    def update_metrics(self):
-        # Get current metrics
-        cpu_percent = psutil.cpu_percent()
+    def _tick(self):
+        """Sample, store, classify and draw one tick"""
+        # Get current metrics; one per-core read, averaged for the overall figure
         cpu_per_core = psutil.cpu_percent(percpu=True)
-        memory = psutil.virtual_memory()
-        memory_percent = memory.percent
+        core_count = len(cpu_per_core)
+        cpu_percent = sum(cpu_per_core) / core_count
+        memory_percent = psutil.virtual_memory().percent
         
         # Calculate K(t) metrics
         active_cores = sum(1 for x in cpu_per_core if x > 10)
         efficiency = self.calculate_efficiency(cpu_percent, active_cores)
         
         # Store metrics
-        metrics = {
+        self.data_handler.add_metrics({
             "cpu_percent": cpu_percent,
             "memory_percent": memory_percent,
             "active_cores": active_cores,
             "efficiency": efficiency,
             "cpu_per_core": cpu_per_core
-        }
-        self.data_handler.add_metrics(metrics)
-        
-        # Update pattern detection
-        if len(self.efficiency_data) >= 10:  # Analyze patterns every 10 seconds
-            pattern = self.detect_pattern(efficiency)
-            self.data_handler.add_pattern(pattern)
-        
-        # Update UI data
-        self.update_ui_data(metrics)
-
-    def detect_pattern(self, current_efficiency: float) -> Dict:
-        """Detect system behavior pattern"""
-        recent_efficiencies = [e[1] for e in self.efficiency_data[-10:]]
-        avg_efficiency = sum(recent_efficiencies) / len(recent_efficiencies)
-        stability = 1 - (max(recent_efficiencies) - min(recent_efficiencies))
-        
-        pattern = {
-            "type": self.classify_pattern(avg_efficiency),
-            "efficiency": avg_efficiency,
-            "stability": stability,
-            "duration": len(recent_efficiencies)
-        }
+        })
+        self._append_sample(cpu_percent, memory_percent, efficiency)
+        
+        # Pattern detection over the last 10 samples, including this one; the
+        # pattern label shows the same class, or this sample's until 10 exist
+        if self._count >= 10:
+            recent_efficiencies = self._window(self._efficiency)[-10:]
+            avg_efficiency = float(recent_efficiencies.mean())
+            pattern_type = self.classify_pattern(avg_efficiency)
+            self.data_handler.add_pattern({
+                "type": pattern_type,
+                "efficiency": avg_efficiency,
+                "stability": 1 - float(np.ptp(recent_efficiencies)),
+                "duration": len(recent_efficiencies)
+            })
+        else:
+            pattern_type = self.classify_pattern(efficiency)
+        
+        self.update_charts()
         
-        return pattern
+        # Update labels
+        self.efficiency_label.setText(f"Efficiency Score: {efficiency:.3f}")
+        self.pattern_label.setText(f"Pattern: {pattern_type}")
+        self.status_label.setText(
+            f"CPU: {cpu_percent:.1f}% | Memory: {memory_percent:.1f}% | "
+            f"Active Cores: {active_cores}/{core_count}")
+
+    # Public entry point used by the coordinator
+    update_metrics = _tick
 
     def classify_pattern(self, efficiency: float) -> str:
         """Classify system behavior pattern"""
@@ -234,37 +318,15 @@ class KTVisualizationWindow(QMainWindow):
         else:
             return "heavy_load"
 
-    def update_ui_data(self, metrics: Dict):
-        # Update data storage
-        current_time = len(self.cpu_data)
-        self.cpu_data.append((current_time, metrics["cpu_percent"]))
-        self.memory_data.append((current_time, metrics["memory_percent"]))
-        self.efficiency_data.append((current_time, metrics["efficiency"]))
-        
-        # Maintain fixed window
-        if len(self.cpu_data) > self.max_data_points:
-            self.cpu_data.pop(0)
-            self.memory_data.pop(0)
-            self.efficiency_data.pop(0)
-        
-        # Update charts
-        self.update_charts()
-        
-        # Update labels
-        pattern_type = self.classify_pattern(metrics["efficiency"])
-        self.efficiency_label.setText(f"Efficiency Score: {metrics['efficiency']:.3f}")
-        self.pattern_label.setText(f"Pattern: {pattern_type}")
-        self.status_label.setText(
-            f"CPU: {metrics['cpu_percent']:.1f}% | Memory: {metrics['memory_percent']:.1f}% | "
-            f"Active Cores: {metrics['active_cores']}/{len(metrics['cpu_per_core'])}")
-
     def discover_system(self):
         """Discover system capabilities without assumptions"""
+        logical = psutil.cpu_count(logical=True)
+        physical = psutil.cpu_count(logical=False)
         info = {
-            'cpu_count': psutil.cpu_count(logical=False),
-            'thread_count': psutil.cpu_count(logical=True),
+            'cpu_count': physical,
+            'thread_count': logical,
             'memory_total': psutil.virtual_memory().total,
-            'has_smt': psutil.cpu_count(logical=True) > psutil.cpu_count(logical=False)
+            'has_smt': logical > physical
         }
         
         # Get CPU frequency if available
@@ -289,6 +351,10 @@ class KTVisualizationWindow(QMainWindow):
         self.baseline_idle = 0.016 * threads_factor
         self.baseline_load = min(0.449 * threads_factor * memory_factor, 0.95)  # Cap at 95% for safety
         
+        # Specialize the per-tick efficiency math for this system and compile it now
+        self._efficiency_kernel = _make_efficiency_kernel(self.system_info['thread_count'])
+        self._efficiency_kernel(0.0, 0)
+        
         print(f"System discovered: {len(self.system_info)} characteristics")
         print(f"Initialized baselines - Idle: {self.baseline_idle:.3f}, Load: {self.baseline_load:.3f}")
 
@@ -302,15 +368,15 @@ class KTVisualizationWindow(QMainWindow):
         layout.addWidget(self.tabs)
         
         # Performance monitoring tab
-        perf_tab = QWidget()
-        perf_layout = QVBoxLayout(perf_tab)
+        self.perf_tab = QWidget()
+        perf_layout = QVBoxLayout(self.perf_tab)
         self.perf_chart_view = QChartView()
         perf_layout.addWidget(self.perf_chart_view)
-        self.tabs.addTab(perf_tab, "Performance Monitor")
+        self.tabs.addTab(self.perf_tab, "Performance Monitor")
         
         # K(t) Framework tab
-        kt_tab = QWidget()
-        kt_layout = QVBoxLayout(kt_tab)
+        self.kt_tab = QWidget()
+        kt_layout = QVBoxLayout(self.kt_tab)
         self.kt_chart_view = QChartView()
         kt_layout.addWidget(self.kt_chart_view)
         
@@ -325,7 +391,7 @@ class KTVisualizationWindow(QMainWindow):
         metrics_layout.addWidget(self.pattern_label)
         
         kt_layout.addWidget(metrics_panel)
-        self.tabs.addTab(kt_tab, "K(t) Framework Analysis")
+        self.tabs.addTab(self.kt_tab, "K(t) Framework Analysis")
         
         # Control panel
         control_panel = QWidget()
@@ -347,13 +413,16 @@ class KTVisualizationWindow(QMainWindow):
     def setup_performance_chart(self):
         self.perf_chart = QChart()
         self.perf_chart.setTitle("System Performance")
+        self.configure_live_chart(self.perf_chart, self.perf_chart_view)
         
-        # Setup series
+        # Setup series, drawn through OpenGL since they change every tick
         self.cpu_series = QLineSeries()
         self.cpu_series.setName("CPU Usage")
+        self.cpu_series.setUseOpenGL(True)
         
         self.memory_series = QLineSeries()
         self.memory_series.setName("Memory Usage")
+        self.memory_series.setUseOpenGL(True)
         
         # Add series to chart
         self.perf_chart.addSeries(self.cpu_series)
@@ -381,10 +450,12 @@ class KTVisualizationWindow(QMainWindow):
     def setup_efficiency_chart(self):
         self.kt_chart = QChart()
         self.kt_chart.setTitle("K(t) Framework Efficiency")
+        self.configure_live_chart(self.kt_chart, self.kt_chart_view)
         
         # Setup efficiency series
         self.efficiency_series = QLineSeries()
         self.efficiency_series.setName("Efficiency Score")
+        self.efficiency_series.setUseOpenGL(True)
         
         # Add baseline indicators
         self.idle_series = QLineSeries()
@@ -417,13 +488,18 @@ class KTVisualizationWindow(QMainWindow):
         self.load_series.attachAxis(self.kt_axis_x)
         self.load_series.attachAxis(self.kt_axis_y)
         
-        # Add baseline lines
-        for i in range(61):
-            self.idle_series.append(i, self.baseline_idle)
-            self.load_series.append(i, self.baseline_load)
+        # Add baseline lines; the axis is linear, so the two endpoints suffice
+        self.idle_series.replace([QPointF(0, self.baseline_idle), QPointF(60, self.baseline_idle)])
+        self.load_series.replace([QPointF(0, self.baseline_load), QPointF(60, self.baseline_load)])
         
         self.kt_chart_view.setChart(self.kt_chart)
 
+    def configure_live_chart(self, chart: QChart, view: QChartView):
+        """Turn off chart features that cost time on every 1 Hz redraw"""
+        chart.setAnimationOptions(QChart.NoAnimation)
+        view.setRenderHint(QPainter.Antialiasing, False)
+        view.setInteractive(False)  # No hover hit-testing over the points
+
     @Slot()
     def start_monitoring(self):
         self.update_timer.start()
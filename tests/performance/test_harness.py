@@ -5,7 +5,6 @@ import psutil
 import platform
 import os
 import time
-import json
 import signal
 from pathlib import Path
 from datetime import datetime
@@ -13,6 +12,95 @@ from typing import Dict, List, Optional
 import logging
 from concurrent.futures import ThreadPoolExecutor
 import sys
+import ctypes
+import ctypes.util
+import numpy as np
+
+from utils.jsonio import dumps_line, write_json
+from utils.sysinfo import CPU_FREQ, cache_info
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+CLOCK_MONOTONIC = 1
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [('tv_sec', ctypes.c_long), ('tv_nsec', ctypes.c_long)]
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [('it_interval', _Timespec), ('it_value', _Timespec)]
+
+class PeriodicTimer:
+    """
+    Fixed-rate ticker for sampling loops
+    
+    On Linux a timerfd armed on CLOCK_MONOTONIC paces the loop, so ticks
+    don't drift with the time spent between them. Elsewhere it falls back
+    to sleeping until absolute monotonic deadlines.
+    """
+    
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._next = time.monotonic() + interval
+        self._fd = self._create_timerfd(interval)
+    
+    @staticmethod
+    def _create_timerfd(interval: float) -> Optional[int]:
+        if hasattr(os, 'timerfd_create'):  # Python 3.13+
+            fd = os.timerfd_create(time.CLOCK_MONOTONIC)
+            os.timerfd_settime(fd, initial=interval, interval=interval)
+            return fd
+        
+        libc_name = ctypes.util.find_library('c') if sys.platform.startswith('linux') else None
+        if not libc_name:
+            return None
+        libc = ctypes.CDLL(libc_name, use_errno=True)
+        fd = libc.timerfd_create(CLOCK_MONOTONIC, 0)
+        if fd < 0:
+            return None
+        
+        sec, nsec = int(interval), int((interval % 1) * 1e9)
+        spec = _Itimerspec(_Timespec(sec, nsec), _Timespec(sec, nsec))
+        if libc.timerfd_settime(fd, 0, ctypes.byref(spec), None) < 0:
+            os.close(fd)
+            return None
+        return fd
+    
+    def wait(self):
+        """Block until the next tick; ticks missed while busy are not replayed"""
+        if self._fd is not None:
+            os.read(self._fd, 8)
+            return
+        
+        now = time.monotonic()
+        if self._next <= now:
+            self._next = now
+        time.sleep(self._next - now)
+        self._next += self.interval
+    
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+MEMORY_WORKLOAD_BYTES = 100 * 1024 * 1024  # 100MB
+
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _square_range(n):
+        """Squares of 0..n-1, computed across all cores"""
+        out = np.empty(n, np.int64)
+        for i in prange(n):
+            out[i] = i * i
+        return out
+else:
+    def _square_range(n):
+        """Squares of 0..n-1 (vectorized fallback without Numba)"""
+        return np.arange(n, dtype=np.int64) ** 2
 
 class KTTestHarness:
     def __init__(self, data_dir: str = "test_data"):
@@ -41,9 +129,23 @@ class KTTestHarness:
             }
         }
         
+        # Elements squared per cpu_intensive workload pass
+        self.cpu_workload_size = 1_000_000
+        
+        # Compile the CPU kernel now so the first scenario doesn't time the JIT
+        _square_range(1)
+        
+        # Buffer dirtied by each memory pass, allocated by the first one
+        self._mem_buf: Optional[bytearray] = None
+        
         # Register signal handlers
         signal.signal(signal.SIGINT, self.handle_interrupt)
         signal.signal(signal.SIGTERM, self.handle_interrupt)
+        
+        # Workloads and file writes run off the sampling thread; the pools
+        # are created when the first scenario runs
+        self._workload_pool: Optional[ThreadPoolExecutor] = None
+        self._writer: Optional[ThreadPoolExecutor] = None
 
         # Ensure absolute path for data directory
         script_dir = Path(__file__).parent.absolute()
@@ -55,6 +157,12 @@ class KTTestHarness:
         
         # Initialize test session
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Samples carry monotonic offsets from this epoch; wall-clock timestamps are
+        # only formatted when results are written. CLOCK_MONOTONIC is system-wide,
+        # so offsets taken in worker processes share the epoch.
+        self._t0_ns = time.monotonic_ns()
+        self._t0 = np.datetime64(datetime.now(), 'us')
         self.logger.info(f"Initializing test session: {self.session_id}")
         self.logger.info(f"Data directory: {self.data_dir}")
         
@@ -65,6 +173,30 @@ class KTTestHarness:
         # Save test scenarios configuration
         self._save_test_scenarios()
 
+    def _start_workers(self):
+        """Create the workload and writer threads, unless they already exist"""
+        if self._writer is None:
+            self._workload_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kt-workload")
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kt-writer")
+
+    def __getstate__(self):
+        """Pickle without thread pools or buffers so the harness can be sent to worker processes"""
+        state = self.__dict__.copy()
+        state['_workload_pool'] = state['_writer'] = state['_mem_buf'] = None
+        return state
+
+    def __setstate__(self, state):
+        # Root logging belongs to the worker's pool initializer; only the
+        # harness log file is re-attached if this process doesn't have it
+        self.__dict__.update(state)
+        self._attach_log_file()
+
+    def close(self):
+        """Wait for queued workloads and result writes to finish"""
+        if self._writer is not None:
+            self._workload_pool.shutdown(wait=True)
+            self._writer.shutdown(wait=True)
+
     def handle_interrupt(self, *args):
         """Handle interrupt signals gracefully"""
         if self._shutdown_requested:
@@ -77,31 +209,44 @@ class KTTestHarness:
 
     def _setup_logging(self):
         """Configure logging for test harness"""
-        log_file = self.data_dir / f"test_harness_{datetime.now():%Y%m%d}.log"
+        # Console output goes through the root logger; when a coordinator has
+        # already configured it, its handlers are used as they are
+        if not logging.getLogger().handlers:
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            logging.basicConfig(level=logging.INFO, handlers=[console_handler])
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
         self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        self._attach_log_file()
+
+    def _attach_log_file(self):
+        """Attach the harness log file to the harness logger unless it already is"""
+        # On the harness logger itself, so the file is written whether or not
+        # the root logger was configured elsewhere
+        log_file = self.data_dir / f"test_harness_{datetime.now():%Y%m%d}.log"
+        if not any(getattr(h, 'baseFilename', None) == str(log_file) for h in self.logger.handlers):
+            file_handler = logging.FileHandler(log_file)
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            self.logger.addHandler(file_handler)
 
-    def run_test_scenario(self, scenario: str):
-        """Run a specific test scenario"""
+    def run_test_scenario(self, scenario: str) -> List[Dict]:
+        """Run a specific test scenario and return the collected metrics"""
         if not self.running or scenario not in self.test_scenarios:
-            return
+            return []
             
+        self._start_workers()
         self.current_scenario = scenario
         scenario_config = self.test_scenarios[scenario]
         duration = scenario_config['duration']
+        metrics = []
         
         try:
-            metrics = self._collect_metrics(duration)
-            if metrics:
-                self._save_scenario_results(scenario, metrics)
+            results_file = self._open_scenario_results(scenario)
+            try:
+                metrics = self._collect_metrics(duration, results_file)
+            finally:
+                self._writer.submit(self._close_scenario_results, results_file)
                 
         except Exception as e:
             self.logger.error(f"Error in test scenario {scenario}: {e}")
@@ -109,29 +254,49 @@ class KTTestHarness:
             
         finally:
             self.current_scenario = None
+        
+        return metrics
 
-    def _collect_metrics(self, duration: int) -> List[Dict]:
-        """Collect system metrics for specified duration"""
+    def _collect_metrics(self, duration: int, results_file=None) -> List[Dict]:
+        """Collect system metrics for specified duration, streaming each sample to results_file"""
         metrics = []
-        start_time = time.time()
+        start_time = time.monotonic()
+        timer = PeriodicTimer(1.0)
+        workload = None
         
-        while (time.time() - start_time) < duration and self.running:
-            try:
-                metrics.append(self._get_current_metrics())
-                self._generate_workload(self.current_scenario)
-                time.sleep(1)
-            except Exception as e:
-                self.logger.error(f"Error collecting metrics: {e}")
+        try:
+            while (time.monotonic() - start_time) < duration and self.running:
+                try:
+                    sample = self._get_current_metrics()
+                    metrics.append(sample)
+                    if results_file is not None:
+                        self._writer.submit(self._write_sample, results_file, sample)
+                    
+                    # The workload runs beside the sampler; a new one starts only
+                    # once the previous one has finished
+                    if workload is None or workload.done():
+                        workload = self._workload_pool.submit(self._generate_workload,
+                                                              self.current_scenario)
+                    timer.wait()
+                except Exception as e:
+                    self.logger.error(f"Error collecting metrics: {e}")
+        finally:
+            timer.close()
+            if workload is not None:
+                try:
+                    workload.result()
+                except Exception as e:
+                    self.logger.error(f"Error generating workload: {e}")
                 
         return metrics
 
     def _get_current_metrics(self) -> Dict:
         """Get current system metrics"""
         return {
-            'timestamp': datetime.now().isoformat(),
+            'offset_ns': time.monotonic_ns() - self._t0_ns,
             'cpu': {
                 'percent': psutil.cpu_percent(percpu=True),
-                'freq': psutil.cpu_freq(percpu=True) if hasattr(psutil, 'cpu_freq') else None,
+                'freq': CPU_FREQ(percpu=True) if CPU_FREQ else None,
             },
             'memory': {
                 'virtual': dict(psutil.virtual_memory()._asdict()),
@@ -150,13 +315,16 @@ class KTTestHarness:
         # idle scenario does nothing
 
     def _cpu_workload(self):
-        _ = [i * i for i in range(1000000)]
+        _square_range(self.cpu_workload_size)
 
     def _memory_workload(self):
-        chunk_size = 100 * 1024 * 1024  # 100MB
-        data = bytearray(chunk_size)
+        if self._mem_buf is None:
+            self._mem_buf = bytearray(MEMORY_WORKLOAD_BYTES)
+        
+        # Write every page of the buffer so the pass moves real memory traffic
+        size = len(self._mem_buf)
+        ctypes.memset((ctypes.c_char * size).from_buffer(self._mem_buf), 0, size)
         time.sleep(0.1)
-        del data
 
     def _mixed_workload(self):
         self._cpu_workload()
@@ -202,54 +370,64 @@ class KTTestHarness:
 
     def _get_cache_info(self) -> Dict:
         """Get CPU cache information"""
-        cache_info = {}
         try:
-            # Linux-specific cache info
-            if platform.system() == 'Linux':
-                cache_path = Path('/sys/devices/system/cpu/cpu0/cache')
-                if cache_path.exists():
-                    for level in cache_path.glob('index*'):
-                        size = (level / 'size').read_text().strip()
-                        type = (level / 'type').read_text().strip()
-                        cache_info[f"L{level.name[-1]}_{type}"] = size
+            return cache_info()
         except Exception as e:
             self.logger.warning(f"Could not get cache information: {e}")
-        return cache_info
+        return {}
 
     def _save_system_info(self):
         """Save system information to file"""
         info_file = self.data_dir / f"system_info_{self.session_id}.json"
-        with open(info_file, 'w') as f:
-            json.dump(self.system_info, f, indent=2)
+        write_json(info_file, self.system_info)
         self.logger.info(f"Saved system information to {info_file}")
 
     def _save_test_scenarios(self):
         """Save test scenarios configuration"""
         scenarios_file = self.data_dir / "test_scenarios.json"
-        with open(scenarios_file, 'w') as f:
-            json.dump(self.test_scenarios, f, indent=2)
+        write_json(scenarios_file, self.test_scenarios)
         self.logger.info(f"Saved test scenarios to {scenarios_file}")
 
-    def _save_scenario_results(self, scenario: str, metrics: List[Dict]):
-        """Save scenario metrics to file"""
+    def _write_scenario_header(self, scenario: str) -> Path:
+        """Write the scenario header and return the path of its NDJSON metrics file"""
+        results_path = self.data_dir / f"scenario_{scenario}_{self.session_id}.ndjson"
+        header_file = self.data_dir / f"scenario_{scenario}_{self.session_id}_header.json"
+        write_json(header_file, {
+            'scenario': scenario,
+            'timestamp': datetime.now().isoformat(),
+            'system_info': self.system_info,
+            'metrics_file': results_path.name
+        })
+        return results_path
+
+    def _open_scenario_results(self, scenario: str):
+        """Write the scenario header and open its metrics file for streaming"""
+        return open(self._write_scenario_header(scenario), 'wb')
+
+    def _encode_samples(self, samples: List[Dict]) -> bytes:
+        """NDJSON for samples, with their monotonic offsets turned into ISO timestamps"""
+        offsets = np.fromiter((s['offset_ns'] for s in samples), dtype=np.int64, count=len(samples))
+        stamps = np.datetime_as_string(self._t0 + offsets.astype('timedelta64[ns]'), unit='us')
+        
+        lines = []
+        for sample, stamp in zip(samples, stamps.tolist()):
+            record = {'timestamp': stamp}
+            record.update((k, v) for k, v in sample.items() if k not in ('offset_ns', 'timestamp'))
+            lines.append(dumps_line(record))
+        return b''.join(lines)
+
+    def _write_sample(self, results_file, sample: Dict):
+        """Append one metrics sample to an open results file (writer thread)"""
         try:
-            results_file = self.data_dir / f"scenario_{scenario}_{self.session_id}.json"
-            results = {
-                'scenario': scenario,
-                'timestamp': datetime.now().isoformat(),
-                'system_info': self.system_info,
-                'metrics': metrics
-            }
-            
-            with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2)
-            
-            self.logger.info(f"Saved scenario results to {results_file}")
-            print(f"Results saved to: {results_file}")
-            
+            results_file.write(self._encode_samples([sample]))
         except Exception as e:
-            self.logger.error(f"Error saving results: {e}")
-            print(f"Error saving results: {e}")
+            self.logger.error(f"Error saving sample: {e}")
+
+    def _close_scenario_results(self, results_file):
+        """Close a streamed results file once its queued samples are written"""
+        results_file.close()
+        self.logger.info(f"Saved scenario results to {results_file.name}")
+        print(f"Results saved to: {results_file.name}")
 
 def main():
     """Run a test session with all scenarios"""
@@ -278,6 +456,7 @@ def main():
     finally:
         if harness.current_scenario:
             print(f"Cleaning up scenario: {harness.current_scenario}")
+        harness.close()
         print("Test harness shutdown complete")
 
 if __name__ == "__main__":
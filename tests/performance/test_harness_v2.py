@@ -1,29 +1,215 @@
 # Copyright (c) 2025 isekAI
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 import psutil
 import platform
 import os
 import time
-import json
 import signal
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
 import logging
-from concurrent.futures import ThreadPoolExecutor
-import sys
+import logging.handlers
+import multiprocessing
+import numpy as np
+
+from utils.jsonio import dumps_line, write_json
+from utils.sysinfo import CPU_FREQ, cache_info
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+def _write_columns(path: Path, arrays: Dict[str, np.ndarray]) -> Path:
+    """
+    Write sample columns as zstd Parquet, or as a compressed .npz archive
+    when pyarrow isn't installed. Returns the path written.
+    """
+    if pa is None:
+        path = path.with_suffix('.npz')
+        np.savez_compressed(path, **arrays)
+        return path
+    
+    # Parquet columns are flat; per-core columns become name_0, name_1, ...
+    columns = {}
+    for name, values in arrays.items():
+        if values.ndim == 1:
+            columns[name] = values
+        else:
+            for core in range(values.shape[1]):
+                columns[f"{name}_{core}"] = values[:, core]
+    
+    path = path.with_suffix('.parquet')
+    pq.write_table(pa.table(columns), path, compression='zstd')
+    return path
+
+# Workload pass sizes: the CPU pass runs a chain of multiply-adds on every
+# element of a small array, the memory pass writes every byte of a large one
+CPU_WORKLOAD_ELEMENTS = 1 << 20
+CPU_WORKLOAD_ROUNDS = 16
+MEMORY_WORKLOAD_BYTES = 100 * 1024 * 1024  # 100MB
+
+# Seconds a workload process gets to stop before it is terminated, and how
+# often the event loop checks on it meanwhile
+WORKLOAD_STOP_TIMEOUT = 5.0
+WORKLOAD_POLL_INTERVAL = 0.05
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _fma_rounds(x, rounds):
+        """Dependent multiply-adds per element, spread across all cores"""
+        for i in prange(x.size):
+            v = x[i]
+            for _ in range(rounds):
+                v = v * 0.999999 + 0.5
+            x[i] = v
+    
+    @njit(parallel=True, cache=True)
+    def _fill(buf, value):
+        """Write every element of buf, spread across all cores"""
+        for i in prange(buf.size):
+            buf[i] = value
+else:
+    def _fma_rounds(x, rounds):
+        """Multiply-adds per element (vectorized fallback without Numba)"""
+        for _ in range(rounds):
+            x *= 0.999999
+            x += 0.5
+    
+    def _fill(buf, value):
+        """Write every element of buf (fallback without Numba)"""
+        buf.fill(value)
+
+class _WorkloadBuffers:
+    """
+    Arrays the workload passes run over, held for the life of the workload process
+    
+    Each array is allocated by the first pass that uses it, so a scenario
+    only pays for the buffers its WORKLOADS entry touches.
+    """
+    
+    def __init__(self):
+        self._cpu: Optional[np.ndarray] = None
+        self._memory: Optional[np.ndarray] = None
+    
+    @property
+    def cpu(self) -> np.ndarray:
+        if self._cpu is None:
+            self._cpu = np.zeros(CPU_WORKLOAD_ELEMENTS, dtype=np.float64)
+        return self._cpu
+    
+    @property
+    def memory(self) -> np.ndarray:
+        if self._memory is None:
+            self._memory = np.zeros(MEMORY_WORKLOAD_BYTES, dtype=np.uint8)
+        return self._memory
+
+def _cpu_pass(buffers: _WorkloadBuffers):
+    _fma_rounds(buffers.cpu, CPU_WORKLOAD_ROUNDS)
+
+def _memory_pass(buffers: _WorkloadBuffers):
+    _fill(buffers.memory, 1)
+
+# Workload passes run back to back for each scenario; idle runs none
+WORKLOADS = {
+    "idle": (),
+    "cpu_intensive": (_cpu_pass,),
+    "memory_intensive": (_memory_pass,),
+    "mixed_load": (_cpu_pass, _memory_pass)
+}
+
+def _run_workload(scenario: str, duration: float, stop):
+    """Workload process body: run the scenario's passes until stopped or duration elapses"""
+    # Interrupts are handled by the harness, which stops this process through stop
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    
+    passes = WORKLOADS[scenario]
+    buffers = _WorkloadBuffers()
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time and not stop.is_set():
+        for workload_pass in passes:
+            workload_pass(buffers)
+
+# Longest history kept per scenario (an hour at 1 Hz); older samples are overwritten
+MAX_SCENARIO_SAMPLES = 3600
+
+@dataclass
+class SampleColumns:
+    """
+    Scenario samples stored column by column in preallocated arrays
+    
+    The arrays form a ring: once capacity samples are held, each new sample
+    overwrites the oldest and is counted in dropped.
+    """
+    offset_ns: np.ndarray       # int64 time.monotonic_ns() since the session started
+    cpu_percent: np.ndarray     # (samples, cpus) float32
+    cpu_freq: np.ndarray        # (samples, cpus or 1 aggregate or 0) float32, MHz
+    memory_used: np.ndarray     # uint64 bytes
+    memory_available: np.ndarray
+    memory_percent: np.ndarray  # float32
+    swap_used: np.ndarray
+    swap_percent: np.ndarray
+    written: int = 0            # Samples recorded, including overwritten ones
+    late: int = 0               # Samples taken after their deadline had passed
+    
+    @classmethod
+    def allocate(cls, capacity: int, cpus: int, freq_cpus: int) -> 'SampleColumns':
+        return cls(
+            offset_ns=np.empty(capacity, dtype=np.int64),
+            cpu_percent=np.empty((capacity, cpus), dtype=np.float32),
+            cpu_freq=np.empty((capacity, freq_cpus), dtype=np.float32),
+            memory_used=np.empty(capacity, dtype=np.uint64),
+            memory_available=np.empty(capacity, dtype=np.uint64),
+            memory_percent=np.empty(capacity, dtype=np.float32),
+            swap_used=np.empty(capacity, dtype=np.uint64),
+            swap_percent=np.empty(capacity, dtype=np.float32)
+        )
+    
+    def __len__(self) -> int:
+        return min(self.written, self.capacity)
+    
+    @property
+    def capacity(self) -> int:
+        return len(self.offset_ns)
+    
+    @property
+    def dropped(self) -> int:
+        return max(0, self.written - self.capacity)
+    
+    @property
+    def head(self) -> int:
+        """Row the next sample is written to"""
+        return self.written % self.capacity
+    
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """Held samples of every column, oldest first, keyed by column name"""
+        if self.dropped:
+            order = np.roll(np.arange(self.capacity), -self.head)
+        else:
+            order = slice(0, self.written)
+        return {f.name: getattr(self, f.name)[order]
+                for f in fields(self) if f.name not in ('written', 'late')}
 
 class KTTestHarness:
     """Test harness for K(t) Framework OS-level testing"""
     
-    def __init__(self, data_dir: str = "test_data"):
+    def __init__(self, data_dir: str = "test_data", sample_hz: float = 1.0,
+                 freq_stride: int = 10):
         self.running = True
+        self.sample_hz = sample_hz
+        self.freq_stride = freq_stride
         self.current_scenario = None
-        
-        # Register signal handlers
-        signal.signal(signal.SIGINT, self.handle_interrupt)
-        signal.signal(signal.SIGTERM, self.handle_interrupt)
+        self._scenario_metrics: Optional[SampleColumns] = None
         
         # Ensure absolute path for data directory
         script_dir = Path(__file__).parent.absolute()
@@ -35,6 +221,11 @@ class KTTestHarness:
         
         # Initialize test session
         self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # Samples record monotonic offsets from this point; wall-clock times
+        # are only materialized when results are saved
+        self._t0_wall = np.datetime64(datetime.now(), 'ns')
+        self._t0_mono = time.monotonic_ns()
         self.logger.info(f"Initializing test session: {self.session_id}")
         self.logger.info(f"Data directory: {self.data_dir}")
         
@@ -42,6 +233,10 @@ class KTTestHarness:
         self.system_info = self._discover_system()
         self._save_system_info()
         
+        # Per-core min/max frequencies are fixed; samples only carry current
+        self._static_freq = self.system_info['hardware']['cpu']['frequencies']
+        self._freq_percpu, self._freq_cpus = self._frequency_columns()
+        
         # Initialize metrics collection
         self.metrics: List[Dict] = []
         self.test_scenarios = {
@@ -53,37 +248,54 @@ class KTTestHarness:
         
         self._save_test_scenarios()
 
-    def handle_interrupt(self, signum, frame):
-        """Handle interrupt signals"""
+    def handle_interrupt(self, *args):
+        """Handle interrupt signals; the session task is cancelled by main_async"""
         print("\nReceived interrupt signal. Cleaning up...")
         self.running = False
         if self.current_scenario:
             print(f"Stopping scenario: {self.current_scenario}")
-        sys.exit(0)
 
     def _setup_logging(self):
         """Configure logging for test harness"""
         log_file = self.data_dir / f"test_harness_{datetime.now():%Y%m%d}.log"
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s',
+                                      datefmt='%H:%M:%S')
         
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file),
-                logging.StreamHandler()
-            ]
-        )
+        # File records are held in memory and written in batches; errors, a
+        # full buffer, or the end of a scenario flush them
+        file_handler = logging.FileHandler(log_file, delay=True)
+        file_handler.setFormatter(formatter)
+        self._log_buffer = logging.handlers.MemoryHandler(
+            1024, flushLevel=logging.ERROR, target=file_handler)
+        
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        
+        # Handlers are on this logger only; records don't also go through the root
         self.logger = logging.getLogger(__name__)
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        for handler in list(self.logger.handlers):  # Left by an earlier harness
+            self.logger.removeHandler(handler)
+            target = getattr(handler, 'target', None)
+            handler.close()
+            if target is not None:
+                target.close()
+        self.logger.addHandler(self._log_buffer)
+        self.logger.addHandler(console_handler)
 
     def _save_test_scenarios(self):
         """Save test scenarios configuration"""
         scenarios_file = self.data_dir / "test_scenarios.json"
-        with open(scenarios_file, 'w') as f:
-            json.dump(self.test_scenarios, f, indent=2)
+        write_json(scenarios_file, self.test_scenarios)
         self.logger.info(f"Saved test scenarios to {scenarios_file}")
 
     def run_test_scenario(self, scenario: str):
         """Run a specific test scenario"""
+        asyncio.run(self.run_test_scenario_async(scenario))
+
+    async def run_test_scenario_async(self, scenario: str):
+        """Run a specific test scenario on the current event loop"""
         if not self.running or scenario not in self.test_scenarios:
             return
         
@@ -95,37 +307,16 @@ class KTTestHarness:
         print(f"Duration: {duration} seconds")
         print(f"Description: {scenario_config['description']}")
         
-        start_time = time.time()
-        scenario_metrics = []
+        # Allocated up front so samples taken before a cancellation can still be saved
+        self._scenario_metrics = self._allocate_columns(duration)
+        
+        # The workload runs in its own process so it never delays a sample;
+        # the event loop only samples and shows progress
+        workload = self._start_workload(scenario, duration)
         
         try:
-            with ThreadPoolExecutor(max_workers=2) as executor:
-                # Start metric collection
-                future_metrics = executor.submit(
-                    self._collect_metrics, 
-                    duration
-                )
-                
-                # Start workload
-                future_workload = executor.submit(
-                    self._generate_workload,
-                    scenario
-                )
-                
-                # Show progress while waiting
-                while (time.time() - start_time) < duration and self.running:
-                    elapsed = int(time.time() - start_time)
-                    remaining = duration - elapsed
-                    print(f"\rProgress: {elapsed}/{duration} seconds remaining: {remaining}s", end='')
-                    time.sleep(1)
-                
-                print("\nCollecting final metrics...")
-                scenario_metrics = future_metrics.result()
-                
-        except KeyboardInterrupt:
-            print("\nScenario interrupted by user")
-            self.running = False
-            return
+            await self._collect_metrics(duration, self._scenario_metrics)
+            print("\nCollecting final metrics...")
         
         except Exception as e:
             self.logger.error(f"Error in test scenario {scenario}: {e}")
@@ -133,55 +324,160 @@ class KTTestHarness:
             return
         
         finally:
-            if scenario_metrics:
-                self._save_scenario_results(scenario, scenario_metrics)
-            self.current_scenario = None
+            # Also runs when the scenario is cancelled by an interrupt
+            try:
+                await self._stop_workload(workload)
+            finally:
+                self.flush_partial(scenario)
+                self.current_scenario = None
+                self._log_buffer.flush()
         
         if self.running:
             print(f"\nCompleted scenario: {scenario}")
 
-    def _collect_metrics(self, duration: int) -> List[Dict]:
-        """Collect system metrics for specified duration"""
-        metrics = []
-        end_time = time.time() + duration
+    def _start_workload(self, scenario: str, duration: int):
+        """Start the scenario's workload process; None for scenarios without one"""
+        if not WORKLOADS[scenario]:
+            return None
+        
+        stop = multiprocessing.Event()
+        process = multiprocessing.Process(target=_run_workload, args=(scenario, duration, stop),
+                                          name=f"kt-workload-{scenario}", daemon=True)
+        process.start()
+        return process, stop
+
+    async def _stop_workload(self, workload):
+        """Signal the workload process to stop and wait for it without blocking the event loop"""
+        if workload is None:
+            return
+        
+        process, stop = workload
+        stop.set()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + WORKLOAD_STOP_TIMEOUT
+        try:
+            while process.is_alive() and loop.time() < deadline:
+                await asyncio.sleep(WORKLOAD_POLL_INTERVAL)
+        finally:
+            # Also reached when the wait itself is cancelled
+            if process.is_alive():
+                self.logger.warning(f"Workload process {process.name} did not stop; terminating it")
+                process.terminate()
+        
+        while process.is_alive():
+            await asyncio.sleep(WORKLOAD_POLL_INTERVAL)
+
+    def _allocate_columns(self, duration: int) -> SampleColumns:
+        """Columns for every sample in duration, plus the one taken at the start"""
+        return SampleColumns.allocate(
+            min(int(duration * self.sample_hz) + 1, MAX_SCENARIO_SAMPLES),
+            self.system_info['hardware']['cpu']['logical_cores'],
+            self._freq_cpus
+        )
+
+    def _frequency_columns(self) -> Tuple[bool, int]:
+        """Whether current frequency is sampled per core, and its column count
+
+        Per-core readings are only used when psutil reports one per logical
+        core; otherwise (a single aggregate entry, a different count) the
+        aggregate frequency fills a single column. No columns when there is
+        no frequency data at all.
+        """
+        cores = self.system_info['hardware']['cpu']['logical_cores']
+        if cores > 1 and len(self._static_freq.get('current', ())) == cores:
+            return True, cores
+        try:
+            if CPU_FREQ is not None and CPU_FREQ() is not None:
+                return False, 1
+        except Exception as e:
+            self.logger.warning(f"Could not get CPU frequency: {e}")
+        return False, 0
+
+    def flush_partial(self, scenario: str):
+        """Save whatever the current scenario has collected so far"""
+        metrics, self._scenario_metrics = self._scenario_metrics, None
+        if metrics:
+            self._save_scenario_results(scenario, metrics)
+
+    async def _collect_metrics(self, duration: int, metrics: SampleColumns) -> SampleColumns:
+        """Collect system metrics for specified duration into metrics"""
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.sample_hz
+        start_time = deadline = loop.time()
+        end_time = deadline + duration
+        shown = -1
         
-        while time.time() < end_time and self.running:
+        # Samples are scheduled on absolute deadlines, so time spent taking
+        # one doesn't push back the next
+        while deadline < end_time and self.running:
             try:
-                metrics.append(self._get_current_metrics())
-                time.sleep(1)
-                
+                self._record_sample(metrics)
             except Exception as e:
                 self.logger.error(f"Error collecting metrics: {e}")
+            
+            # Progress is shown from the same loop, once per elapsed second
+            elapsed = int(loop.time() - start_time)
+            if elapsed != shown:
+                shown = elapsed
+                print(f"\rProgress: {elapsed}/{duration} seconds remaining: {duration - elapsed}s", end='')
+            
+            deadline += period
+            delay = deadline - loop.time()
+            if delay < 0:
+                # Behind schedule: count it and restart from now rather than
+                # sampling in a burst to catch up
+                metrics.late += 1
+                deadline = loop.time()
+                delay = 0
+            await asyncio.sleep(delay)
                 
         return metrics
 
-    def _get_current_metrics(self) -> Dict:
-        """Get current system metrics"""
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'cpu': {
-                'percent': psutil.cpu_percent(percpu=True),
-                'freq': psutil.cpu_freq(percpu=True) if hasattr(psutil, 'cpu_freq') else None,
-            },
-            'memory': {
-                'virtual': dict(psutil.virtual_memory()._asdict()),
-                'swap': dict(psutil.swap_memory()._asdict())
-            }
-        }
+    def _record_sample(self, columns: SampleColumns):
+        """Write current system metrics into the next row of columns"""
+        i = columns.head
+        columns.offset_ns[i] = time.monotonic_ns() - self._t0_mono
+        columns.cpu_percent[i] = psutil.cpu_percent(interval=None, percpu=True)
+        if columns.cpu_freq.shape[1]:
+            # Reading every core's frequency costs a file per core, so it is
+            # refreshed every freq_stride samples and held in between.
+            # Min/max per core are fixed and recorded in system_info.
+            if columns.written % self.freq_stride == 0:
+                if self._freq_percpu:
+                    self._last_freq = [freq.current for freq in CPU_FREQ(percpu=True)]
+                else:
+                    self._last_freq = CPU_FREQ().current
+            columns.cpu_freq[i] = self._last_freq
+        
+        memory = psutil.virtual_memory()
+        columns.memory_used[i] = memory.used
+        columns.memory_available[i] = memory.available
+        columns.memory_percent[i] = memory.percent
+        
+        swap = psutil.swap_memory()
+        columns.swap_used[i] = swap.used
+        columns.swap_percent[i] = swap.percent
+        columns.written += 1
 
-    def _save_scenario_results(self, scenario: str, metrics: List[Dict]):
+    def _save_scenario_results(self, scenario: str, metrics: SampleColumns):
         """Save scenario metrics to file"""
         try:
             results_file = self.data_dir / f"scenario_{scenario}_{self.session_id}.json"
-            results = {
+            
+            # Samples go to a columnar file; the JSON sidecar keeps the
+            # scenario metadata and points at it
+            arrays = metrics.arrays()
+            arrays['timestamp'] = self._t0_wall + arrays['offset_ns'].astype('timedelta64[ns]')
+            columns_file = _write_columns(results_file, arrays)
+            results_file.write_bytes(dumps_line({
                 'scenario': scenario,
                 'timestamp': datetime.now().isoformat(),
                 'system_info': self.system_info,
-                'metrics': metrics
-            }
-            
-            with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2)
+                'samples': len(metrics),
+                'dropped': metrics.dropped,
+                'late_samples': metrics.late,
+                'metrics_file': columns_file.name
+            }))
             
             self.logger.info(f"Saved scenario results to {results_file}")
             print(f"Results saved to: {results_file}")
@@ -230,44 +526,57 @@ class KTTestHarness:
 
     def _get_cache_info(self) -> Dict:
         """Get CPU cache information"""
-        cache_info = {}
         try:
-            # Linux-specific cache info
-            if platform.system() == 'Linux':
-                cache_path = Path('/sys/devices/system/cpu/cpu0/cache')
-                if cache_path.exists():
-                    for level in cache_path.glob('index*'):
-                        size = (level / 'size').read_text().strip()
-                        type = (level / 'type').read_text().strip()
-                        cache_info[f"L{level.name[-1]}_{type}"] = size
+            return cache_info()
         except Exception as e:
             self.logger.warning(f"Could not get cache information: {e}")
-        return cache_info
+        return {}
 
     def _save_system_info(self):
         """Save system information to file"""
         info_file = self.data_dir / f"system_info_{self.session_id}.json"
-        with open(info_file, 'w') as f:
-            json.dump(self.system_info, f, indent=2)
+        write_json(info_file, self.system_info)
         self.logger.info(f"Saved system information to {info_file}")
 
-def main():
+async def main_async():
     """Run a test session with all scenarios"""
     harness = KTTestHarness()
     
+    # An interrupt cancels this task; the cancellation unwinds through the
+    # running scenario, which saves the samples it has collected
+    loop = asyncio.get_running_loop()
+    session_task = asyncio.current_task()
+    
+    def interrupt(*args):
+        harness.handle_interrupt()
+        session_task.cancel()
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, interrupt)
+        except NotImplementedError:
+            # No loop signal handlers on Windows; hand the interrupt to the loop
+            signal.signal(sig, lambda *args: loop.call_soon_threadsafe(interrupt))
+    
     print("\nK(t) Framework Test Harness")
     print("---------------------------")
     print("Press Ctrl+C at any time to stop testing\n")
     
-    for scenario in harness.test_scenarios:
-        if not harness.running:
-            break
-        harness.run_test_scenario(scenario)
+    try:
+        for scenario in harness.test_scenarios:
+            if not harness.running:
+                break
+            await harness.run_test_scenario_async(scenario)
+    except asyncio.CancelledError:
+        harness.running = False
     
     if harness.running:
         print("\nAll test scenarios completed")
     else:
         print("\nTesting stopped by user")
 
+def main():
+    asyncio.run(main_async())
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,6 +1,30 @@
+import fnmatch
 import os
+import re
+import sys
 from pathlib import Path
 
+# Tree output is many short lines; write them through one large buffer
+OUTPUT_BUFFER_BYTES = 256 * 1024
+
+# Output pieces, encoded once. The tree is walked with bytes paths, so names
+# arrive as bytes too and lines are assembled without any str formatting.
+_INDENTS = tuple(('│   ' * i).encode('utf-8') for i in range(128))
+_BRANCH = '├── '.encode('utf-8')
+_DIR_END = b'/\n'
+_NL = b'\n'
+
+def compile_ignore_patterns(patterns):
+    """Combine glob-style patterns into one bytes regex matched against entry names"""
+    # An empty alternation would match every name; (?!) matches none
+    regex = '|'.join(fnmatch.translate(p) for p in patterns) or '(?!)'
+    return re.compile(os.fsencode(regex))
+
+def _indent(level):
+    if level < len(_INDENTS):
+        return _INDENTS[level]
+    return ('│   ' * level).encode('utf-8')
+
 def generate_tree(startpath, output_file=None, ignore_patterns=None):
     """
     Generate a tree-like directory structure and optionally write to a file.
@@ -13,45 +37,41 @@ def generate_tree(startpath, output_file=None, ignore_patterns=None):
     if ignore_patterns is None:
         ignore_patterns = ['.git', '__pycache__', '*.pyc', '.pytest_cache', 'venv', 'ENV']
     
-    def should_ignore(path):
-        return any(pattern in path for pattern in ignore_patterns)
-    
-    output_lines = []
+    ignore_re = compile_ignore_patterns(ignore_patterns)
     
-    def add_line(line):
-        if output_file:
-            output_lines.append(line)
-        else:
-            print(line)
-    
-    add_line(startpath)
-    
-    for root, dirs, files in os.walk(startpath):
-        if should_ignore(root):
-            continue
-            
-        # Calculate the current depth and prefix
-        level = root.replace(startpath, '').count(os.sep)
-        indent = '│   ' * level
-        
-        # Filter out ignored directories
-        dirs[:] = [d for d in dirs if not should_ignore(os.path.join(root, d))]
+    def walk(out, path, level):
+        indent = _indent(level)
+        # One pass per directory: each entry is matched and classified once,
+        # and ignored entries never reach the sort
+        with os.scandir(path) as it:
+            entries = [(not entry.is_dir(), entry.name, entry)
+                       for entry in it if not ignore_re.match(entry.name)]
+        entries.sort(key=lambda item: item[:2])
         
-        # Add directories
-        for d in dirs:
-            if not should_ignore(os.path.join(root, d)):
-                add_line(f'{indent}├── {d}/')
-        
-        # Add files
-        for f in files:
-            if not should_ignore(os.path.join(root, f)):
-                add_line(f'{indent}├── {f}')
+        # Directories first, each followed by its own contents
+        for is_file, name, entry in entries:
+            if is_file:
+                out.write(indent + _BRANCH + name + _NL)
+                continue
+            out.write(indent + _BRANCH + name + _DIR_END)
+            # Like os.walk, list symlinked directories but don't descend into them
+            if not entry.is_symlink():
+                walk(out, entry.path, level + 1)
+    
+    def write_tree(out):
+        root = os.fsencode(startpath)
+        out.write(root + _NL)
+        walk(out, root, 0)
     
-    # Write to file if specified
+    # Lines are written as they are generated, to the file if specified
     if output_file:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(output_lines))
+        with open(output_file, 'wb', buffering=OUTPUT_BUFFER_BYTES) as f:
+            write_tree(f)
         print(f"Tree structure written to {output_file}")
+    else:
+        sys.stdout.flush()
+        write_tree(sys.stdout.buffer)
+        sys.stdout.buffer.flush()
 
 if __name__ == "__main__":
     # Get the current directory